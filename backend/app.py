@@ -1,9 +1,10 @@
-from flask import Flask, jsonify
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
-from nba_api.stats.endpoints import scoreboardv2, leaguegamefinder
-from nba_api.stats.static import teams
-from datetime import datetime, timedelta
-import pandas as pd
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import time
 
 app = Flask(__name__)
 CORS(app)
@@ -11,34 +12,208 @@ CORS(app)
 # Warriors Team ID
 WARRIORS_ID = 1610612744
 
-# Simple in-memory cache
-cache = {
-    "schedule": {"data": [], "timestamp": None},
-    "last_game": {"data": None, "timestamp": None},
-    "game_details": {} # Key: game_id, Value: {data, timestamp}
+from collections import namedtuple
+
+from bounded_cache import BoundedCache
+from compression import EncodedBody
+from data_store import CHECK_INTERVAL, day_bounds, day_end, day_start, store
+from events import HEARTBEAT, HEARTBEAT_SECONDS, event_log
+from live_scores import start_live_poller
+from metrics import CONTENT_TYPE, LATENCY_BUCKETS, SIZE_BUCKETS, registry
+from responses import UPCOMING_LIMIT, dump_body, game_details_body, last_game_body
+from swr_cache import SWRCache
+
+# Push snapshot changes to /api/stream clients, then parse the data files
+# once at startup; handlers read the current snapshot
+store.on_swap(event_log.publish_changes)
+store.reload()
+
+# Patches in-game scores into the snapshot when LIVE_SCORES is set
+live_poller = start_live_poller()
+
+# /api/schedule paging
+DEFAULT_PAGE_SIZE = UPCOMING_LIMIT
+MAX_PAGE_SIZE = 100
+
+# Browser/CDN cache policy per endpoint: (max-age, stale-while-revalidate) seconds.
+# Data changes about once a day; last-game can flip a few hours after tip-off.
+CACHE_POLICIES = {
+    "last_game": (300, 3600),
+    "schedule": (300, 3600),
+    "game": (3600, 86400),
+    "home": (300, 3600),
 }
-CACHE_DURATION = timedelta(minutes=0)  # Temporarily disabled to force refresh
 
-import json
-import os
+# Server-side cache of the last-game and default schedule responses per team.
+# Entries are fresh for a minute, then served stale for up to a day while a
+# background worker rebuilds them against the latest data snapshot.
+RESPONSE_FRESH_SECONDS = 60
+RESPONSE_STALE_SECONDS = 86400
+response_cache = SWRCache(RESPONSE_FRESH_SECONDS, RESPONSE_STALE_SECONDS, name='responses')
 
-# Load static data
-DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+# Per-game details, keyed by (team id, game id). Game ids come straight from
+# the URL, so the cache is bounded by entries and bytes; ids that aren't in
+# the schedule are remembered briefly so repeats skip the lookup.
+GAME_CACHE_ENTRIES = 4096
+GAME_CACHE_BYTES = 16 * 1024 * 1024
+GAME_CACHE_TTL = 3600
+GAME_CACHE_NEGATIVE_TTL = 300
 
-def load_schedule():
-    try:
-        with open(os.path.join(DATA_DIR, 'schedule.json'), 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading schedule: {e}")
-        return []
+# Other computed bodies (paged schedules, home, ...) are compressed once and
+# memoized by ETag across all teams. Query strings are client-controlled, so
+# this is bounded the same way. Game bodies live only in the game cache, so
+# each budget covers everything it holds.
+RENDERED_CACHE_ENTRIES = 2048
+RENDERED_CACHE_BYTES = 16 * 1024 * 1024
+RENDERED_CACHE_TTL = 3600
+
+# The threaded /api/stream holds a worker per client, so connections are
+# recycled periodically; clients resume transparently via Last-Event-ID.
+# stream_server.py serves the same stream from an event loop.
+STREAM_MAX_SECONDS = 600
+
+# Most ids accepted by one /api/games request
+MAX_BATCH_IDS = 50
+
+# /api/debug/* shows cache internals and upstream URLs, so it is only served
+# in Flask debug mode or with this set
+DEBUG_ROUTES_ENV = 'WARRIORS_DEBUG_ROUTES'
+
+# A rendered response: validators is None for fallbacks and errors, which
+# are sent without ETag/Cache-Control
+CachedResponse = namedtuple('CachedResponse', ['encoded', 'validators', 'status'])
+
+def encoded_size(encoded):
+    return sum(len(body) for body in encoded.variants.values())
+
+def response_size(cached):
+    return encoded_size(cached.encoded)
+
+game_cache = BoundedCache(GAME_CACHE_ENTRIES, GAME_CACHE_BYTES, GAME_CACHE_TTL,
+                          GAME_CACHE_NEGATIVE_TTL, sizeof=response_size, name='games')
+rendered_cache = BoundedCache(RENDERED_CACHE_ENTRIES, RENDERED_CACHE_BYTES, RENDERED_CACHE_TTL,
+                              sizeof=encoded_size, name='rendered')
+
+# Bounded server-side caches, for /metrics and /api/debug/cache
+BOUNDED_CACHES = (game_cache, rendered_cache)
+
+# Request metrics, labelled by URL rule (bounded) rather than raw path
+request_count = registry.counter('warriors_http_requests_total', "Requests by route, method and status.",
+                                 ('route', 'method', 'status'))
+request_latency = registry.histogram('warriors_http_request_duration_seconds',
+                                     "Time to build the response (streams: until the first byte).",
+                                     LATENCY_BUCKETS, ('route',))
+response_bytes = registry.histogram('warriors_http_response_size_bytes', "Response body size as sent.",
+                                    SIZE_BUCKETS, ('route',))
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
 
-def load_team_details():
+@app.after_request
+def record_request(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_count.inc(route, request.method, str(response.status_code))
+        request_latency.observe(time.perf_counter() - start, route)
+        if response.content_length is not None:
+            response_bytes.observe(response.content_length, route)
+    return response
+
+@registry.collector
+def data_metrics():
+    snapshot = store.current()
+    now = time.time()
+    yield ('warriors_data_snapshot_age_seconds', 'gauge', "Seconds since the served data files were written.",
+           (), [((), round(now - snapshot.modified_at, 3))])
+    yield ('warriors_data_snapshot_loaded_seconds', 'gauge', "Seconds since this process loaded the snapshot.",
+           (), [((), round(now - snapshot.loaded_at, 3))])
+    yield ('warriors_data_snapshot_info', 'gauge', "Version of the served snapshot.",
+           ('version',), [((snapshot.version,), 1)])
+    yield ('warriors_cache_events_total', 'counter', "Server-side cache hits, misses, evictions and refreshes.",
+           ('cache', 'event'), [((cache.name, event), value) for cache in (response_cache,) + BOUNDED_CACHES
+                                for event, value in sorted(cache.counters.items())])
+    yield ('warriors_cache_entries', 'gauge', "Entries held by each server-side cache.",
+           ('cache',), [((cache.name,), len(cache)) for cache in (response_cache,) + BOUNDED_CACHES])
+    yield ('warriors_cache_bytes', 'gauge', "Bytes held by the bounded caches.",
+           ('cache',), [((cache.name,), cache.bytes) for cache in BOUNDED_CACHES])
+
+def today_start(now=None):
+    # Epoch of the current Pacific midnight: the day every route works in
+    return day_bounds(time.time() if now is None else now)[0]
+
+def cache_validators(view, route, variant, changed_at=0):
+    # ETag from the data version plus whatever selects the body within it, so
+    # a 304 can be decided without building the response. It is sent weak: the
+    # identity, gzip and br bodies share it and are only semantically equal.
+    key = f"{route}:{variant}".encode('utf-8')
+    etag = f"{view.version}-{hashlib.sha1(key).hexdigest()[:12]}"
+    last_modified = datetime.fromtimestamp(int(max(view.modified_at, changed_at)), timezone.utc)
+    return etag, last_modified
+
+def is_not_modified(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified <= since
+
+def encode_result(result):
+    # build() returns a precompressed EncodedBody (artifacts) or a regular
+    # 200 response, which is compressed here at cheap levels
+    if isinstance(result, EncodedBody):
+        return result
+    built = app.make_response(result)
+    extra = {k: v for k, v in built.headers.items() if k not in ('Content-Type', 'Content-Length')}
+    return EncodedBody(built.get_data(), mimetype=built.mimetype, headers=extra)
+
+def render_body(view, etag, build):
+    # Computed bodies are memoized by ETag. Artifacts are read from disk
+    # (page cache) on each build and kept by the response or game cache
+    key = (view.team_id, etag)
+    encoded = rendered_cache.get(key)
+    if encoded is None:
+        result = build()
+        encoded = encode_result(result)
+        if not isinstance(result, EncodedBody):
+            rendered_cache.put(key, encoded)
+    return encoded
+
+def json_result(data, status=200):
+    return CachedResponse(EncodedBody(dump_body(data)), None, status)
+
+def send_response(route, cached):
+    encoded, validators, status = cached
+    if validators is not None and is_not_modified(*validators):
+        response = app.response_class(status=304)
+    else:
+        encoding, body = encoded.negotiate(request.accept_encodings)
+        response = app.response_class(body, status=status, mimetype=encoded.mimetype, headers=encoded.headers)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if validators is not None:
+        etag, last_modified = validators
+        max_age, stale = CACHE_POLICIES[route]
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = f"public, max-age={max_age}, stale-while-revalidate={stale}"
+    return response
+
+def cached_response(view, route, validators, build):
+    etag, last_modified = validators
+    if is_not_modified(etag, last_modified):
+        return send_response(route, CachedResponse(None, validators, 304))
+    return send_response(route, CachedResponse(render_body(view, etag, build), validators, 200))
+
+def parse_date_arg(value):
+    if value is None:
+        return None
     try:
-        with open(os.path.join(DATA_DIR, 'team_details.json'), 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+        return datetime.strptime(value, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
 
 # Fallback Data (used if API fails or no data found)
 FALLBACK_SCHEDULE = [
@@ -57,198 +232,337 @@ FALLBACK_LAST_GAME = {
     "youtubeLink": "https://www.youtube.com/results?search_query=Golden+State+Warriors+vs+Miami+Heat+2025-11-19+highlights"
 }
 
-@app.route('/api/last-game')
-def get_last_game():
-    global cache
-    
-    # Use PST timezone consistently throughout
-    from datetime import timezone
-    pst = timezone(timedelta(hours=-8))
-    now = datetime.now(pst)
-    
-    # Check cache
-    if cache["last_game"]["data"] and cache["last_game"]["timestamp"]:
-        try:
-            if (now - cache["last_game"]["timestamp"] < CACHE_DURATION):
-                print("Serving last-game from cache")
-                return jsonify(cache["last_game"]["data"])
-        except:
-            # Cache comparison failed, regenerate
-            pass
+def resolve_team(snapshot, team):
+    # Legacy routes (team=None) serve the Warriors from schedule.json
+    if team is None:
+        return snapshot
+    return snapshot.team(team)
+
+@app.route('/api/teams')
+def get_teams():
+    snapshot = store.get()
+    return jsonify([
+        {"id": view.team_id, "name": view.name, "tricode": view.tricode}
+        for view in sorted(snapshot.teams.values(), key=lambda v: v.team_id)
+    ])
+
+def cache_key(team):
+    # Legacy routes share the Warriors entry; team routes key by team id so
+    # "GSW" and "1610612744" hit the same entry
+    if team is None:
+        return None
+    view = store.current().team(team)
+    return view.team_id if view is not None else False
+
+def build_last_game(team_id):
+    now = time.time()
+    snapshot = store.get()
+    view = resolve_team(snapshot, None if team_id is None else str(team_id))
+    if view is None:
+        return json_result({"error": "Team not found"}, 404)
+
+    # Find last played game (prefer games with a recorded result, else
+    # anything that tipped off at least 3 hours ago)
+    last_game = view.index.last_game(now)
+    if not last_game:
+        if view is not snapshot:
+            return json_result({"error": "No games played yet"}, 404)
+        return json_result(FALLBACK_LAST_GAME)
+
+    def build():
+        if view.artifacts:
+            body = view.artifacts.last_game(now)
+            if body is not None:
+                return body
+        return jsonify(last_game_body(last_game, view.name, view.tricode))
+
+    validators = cache_validators(
+        view, "last_game", last_game['id'], view.index.last_game_since(last_game))
+    return CachedResponse(render_body(view, validators[0], build), validators, 200)
+
+def build_schedule(team_id):
+    # Default (unpaged) schedule: upcoming games from today
+    today = today_start()
+    snapshot = store.get()
+    view = resolve_team(snapshot, None if team_id is None else str(team_id))
+    if view is None:
+        return json_result({"error": "Team not found"}, 404)
+
+    future_games, next_cursor = view.index.window(start=today, limit=DEFAULT_PAGE_SIZE, unplayed_only=True)
+    if not future_games and view is snapshot:
+        # Nothing left to play: the fallback list must not get validators
+        return json_result(FALLBACK_SCHEDULE)
+
+    def build():
+        if view.artifacts:
+            body = view.artifacts.upcoming(today)
+            if body is not None:
+                return body
+        response = jsonify(future_games)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
 
+    validators = cache_validators(view, "schedule", f"{today}?[]", today)
+    return CachedResponse(render_body(view, validators[0], build), validators, 200)
+
+def build_home(team_id):
+    # Everything the home page shows, from a single snapshot
+    now = time.time()
+    today = today_start(now)
+    snapshot = store.get()
+    view = resolve_team(snapshot, None if team_id is None else str(team_id))
+    if view is None:
+        return json_result({"error": "Team not found"}, 404)
+
+    last_game = view.index.last_game(now)
+    upcoming, _ = view.index.window(start=today, limit=DEFAULT_PAGE_SIZE, unplayed_only=True)
+    if view is snapshot and not upcoming:
+        upcoming = FALLBACK_SCHEDULE
+    data = {
+        "last_game": last_game_body(last_game, view.name, view.tricode) if last_game
+        else (FALLBACK_LAST_GAME if view is snapshot else None),
+        "next_game": upcoming[0] if upcoming else None,
+        "upcoming": list(upcoming[1:]),
+    }
+
+    last_changed = view.index.last_game_since(last_game) if last_game else 0
+    variant = f"{last_game['id'] if last_game else None}/{today}"
+    validators = cache_validators(view, "home", variant, max(last_changed, today))
+    return CachedResponse(render_body(view, validators[0], lambda: jsonify(data)), validators, 200)
+
+@app.route('/api/home')
+@app.route('/api/teams/<team>/home')
+def get_home(team=None):
+    try:
+        team_id = cache_key(team)
+        if team_id is False:
+            return jsonify({"error": "Team not found"}), 404
+        version = f"{store.current().version}/{today_start()}"
+        cached = response_cache.get(("home", team_id), lambda: build_home(team_id), version)
+        return send_response("home", cached)
+    except Exception as e:
+        print(f"Error fetching home: {e}. Returning fallback.")
+        return jsonify({"last_game": FALLBACK_LAST_GAME, "next_game": FALLBACK_SCHEDULE[0],
+                        "upcoming": FALLBACK_SCHEDULE[1:]})
+
+@app.route('/api/last-game')
+@app.route('/api/teams/<team>/last-game')
+def get_last_game(team=None):
     try:
-        schedule = load_schedule()
-        today = now.date()
-        
-        # Find last played game (prefer games with a recorded result)
-        last_game = None
-        for game in reversed(schedule):
-            if game.get('wl'):
-                last_game = game
-                break
-
-        if not last_game:
-            for game in reversed(schedule):
-                game_date = datetime.strptime(game['date'], '%Y-%m-%d').date()
-
-                # Game is definitely in the past
-                if game_date < today:
-                    last_game = game
-                    break
-
-                # Game is today - check if it's been at least 3 hours since start time
-                if game_date == today and game.get('time'):
-                    try:
-                        # Parse time like "07:00 PM PST"
-                        time_str = game['time'].replace(' PST', '').replace(' PDT', '').strip()
-                        game_time = datetime.strptime(time_str, '%I:%M %p')
-                        # Combine date and time in PST
-                        game_datetime = datetime.combine(game_date, game_time.time(), tzinfo=pst)
-                        # Check if at least 3 hours have passed
-                        hours_since_start = (now - game_datetime).total_seconds() / 3600
-                        if hours_since_start >= 3:
-                            last_game = game
-                            break
-                    except:
-                        # If time parsing fails, skip this game (treat as future)
-                        pass
-        
-        if not last_game:
-            return jsonify(FALLBACK_LAST_GAME)
-
-        # Generate YouTube highlights link
-        query = f"Golden State Warriors vs {last_game['opponent']} {last_game['date']} highlights"
-        import urllib.parse
-        encoded_query = urllib.parse.quote(query)
-        youtube_link = f"https://www.youtube.com/results?search_query={encoded_query}"
-
-        data = {
-            "id": last_game['id'],
-            "date": last_game['date'],
-            "matchup": f"GSW vs {last_game['opponent']}" if last_game['isHome'] else f"GSW @ {last_game['opponent']}",
-            "opponent": last_game['opponent'],
-            "wl": last_game['wl'],
-            "pts": last_game['pts'],
-            "plus_minus": last_game['plus_minus'],
-            "youtubeLink": youtube_link
-        }
-        
-        # Update cache
-        cache["last_game"] = {"data": data, "timestamp": now}
-        return jsonify(data)
+        team_id = cache_key(team)
+        if team_id is False:
+            return jsonify({"error": "Team not found"}), 404
+        cached = response_cache.get(("last_game", team_id), lambda: build_last_game(team_id),
+                                    store.current().version)
+        return send_response("last_game", cached)
     except Exception as e:
         print(f"Error fetching last game: {e}. Returning fallback.")
         return jsonify(FALLBACK_LAST_GAME)
 
 @app.route('/api/schedule')
-def get_schedule():
-    global cache
-    
-    # Use PST timezone consistently throughout
-    from datetime import timezone
-    pst = timezone(timedelta(hours=-8))
-    now = datetime.now(pst)
-    
-    # Check cache
-    if cache["schedule"]["data"] and cache["schedule"]["timestamp"]:
-        try:
-            if (now - cache["schedule"]["timestamp"] < CACHE_DURATION):
-                print("Serving schedule from cache")
-                return jsonify(cache["schedule"]["data"])
-        except:
-            # Cache comparison failed, regenerate
-            pass
+@app.route('/api/teams/<team>/schedule')
+def get_schedule(team=None):
+    today = today_start()
+
+    # Optional range/pagination: ?from=YYYY-MM-DD&to=YYYY-MM-DD&limit=N&cursor=<game id>
+    args = request.args
+    paged = any(k in args for k in ('from', 'to', 'limit', 'cursor'))
 
     try:
-        schedule = load_schedule()
-        today = now.date()
-        
-        future_games = []
-        for game in schedule:
-            # game['date'] is YYYY-MM-DD
-            game_date = datetime.strptime(game['date'], '%Y-%m-%d').date()
-            # Skip already completed games
-            if game.get('wl'):
-                continue
-            # If game is today or in future, include it
-            if game_date >= today:
-                future_games.append(game)
-        
-        # Limit to next 10
-        future_games = future_games[:10]
-
-        if future_games:
-            cache["schedule"] = {"data": future_games, "timestamp": now}
-            return jsonify(future_games)
-        else:
-            return jsonify(FALLBACK_SCHEDULE)
-            
+        start_date = parse_date_arg(args.get('from'))
+        end_date = parse_date_arg(args.get('to'))
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        if not paged:
+            team_id = cache_key(team)
+            if team_id is False:
+                return jsonify({"error": "Team not found"}), 404
+            # The day is part of the version: after midnight yesterday's list
+            # is served once more while the new one is built
+            version = f"{store.current().version}/{today}"
+            cached = response_cache.get(("schedule", team_id), lambda: build_schedule(team_id), version)
+            return send_response("schedule", cached)
+
+        snapshot = store.get()
+        view = resolve_team(snapshot, team)
+        if view is None:
+            return jsonify({"error": "Team not found"}), 404
+        index = view.index
+        cursor = args.get('cursor')
+        if cursor is not None and cursor not in index.positions:
+            return jsonify({"error": "Unknown cursor"}), 400
+
+        def build():
+            # Without an explicit start, list today onwards and skip completed games
+            if start_date is not None:
+                start = day_start(start_date)
+            else:
+                start = today if cursor is None else None
+            future_games, next_cursor = index.window(
+                start=start,
+                end=day_end(end_date) if end_date is not None else None,
+                after_id=cursor,
+                limit=limit,
+                unplayed_only=start_date is None,
+            )
+            response = jsonify(future_games)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+            return response
+
+        # Only the parsed parameters select the body; anything else in the query
+        # string must not mint new ETags or memoized bodies
+        variant = f"{today}?from={start_date}&to={end_date}&limit={limit}&cursor={cursor}"
+        validators = cache_validators(view, "schedule", variant, today)
+        return cached_response(view, "schedule", validators, build)
+
     except Exception as e:
         print(f"Error fetching schedule: {e}. Returning fallback.")
         return jsonify(FALLBACK_SCHEDULE)
 
+def lookup_game(view, game_id, version):
+    """The game's CachedResponse from the game cache, building it on a miss.
+
+    None when the team has no such game. The single and batch game routes
+    both go through here, so the game cache is the only holder of game
+    bodies and its byte budget bounds them.
+    """
+    key = (view.team_id, game_id)
+    cached = game_cache.get(key, version)
+    if cached is game_cache.MISSING:
+        return None
+    if cached is None:
+        target_game = view.index.game(game_id)
+        if not target_game:
+            game_cache.put_missing(key, version)
+            return None
+
+        def build():
+            if view.artifacts:
+                body = view.artifacts.game(game_id)
+                if body is not None:
+                    return body
+
+            response_data = game_details_body(
+                target_game,
+                view.team_details,
+                view.head_to_head(target_game['opponent_id']),
+            )
+            return jsonify(response_data)
+
+        validators = cache_validators(view, "game", game_id)
+        cached = CachedResponse(encode_result(build()), validators, 200)
+        game_cache.put(key, cached, version)
+    return cached
+
 @app.route('/api/game/<game_id>')
-def get_game_details(game_id):
-    print(f"API Request: get_game_details for {game_id}")
-    
-    global cache
-    now = datetime.now()
+@app.route('/api/teams/<team>/game/<game_id>')
+def get_game_details(game_id, team=None):
     game_id = str(game_id) # JSON IDs are ints, but we might receive string
-    
-    # Check cache
-    if game_id in cache["game_details"]:
-        entry = cache["game_details"][game_id]
-        if entry["timestamp"] and (now - entry["timestamp"] < CACHE_DURATION):
-            print(f"Serving game {game_id} from cache")
-            return jsonify(entry["data"])
 
     try:
-        schedule = load_schedule()
-        team_details = load_team_details()
-        
-        # Find game in schedule
-        target_game = None
-        for g in schedule:
-            if str(g['id']) == game_id:
-                target_game = g
-                break
-        
-        if not target_game:
-            return jsonify({"error": "Game not found"}), 404
+        snapshot = store.get()
+        view = resolve_team(snapshot, team)
+        if view is None:
+            return jsonify({"error": "Team not found"}), 404
 
-        opp_id = str(target_game['opponent_id'])
-        details = team_details.get(opp_id, {"record": "N/A", "scorers": []})
-        
-        # Calculate Head-to-Head from schedule
-        h2h_list = []
-        for g in schedule:
-            if str(g['opponent_id']) == opp_id and g['wl']: # Played game against same opponent
-                 h2h_list.append({
-                    "date": g['date'],
-                    "score": g['score'],
-                    "result": g['wl']
-                })
-        
-        # Reverse to show most recent first
-        h2h_list.reverse()
-
-        response_data = {
-            "opponent": target_game['opponent'],
-            "record": details['record'],
-            "scorers": details['scorers'],
-            "h2h": h2h_list
-        }
-        
-        # Update cache
-        cache["game_details"][game_id] = {"data": response_data, "timestamp": now}
-        
-        return jsonify(response_data)
+        cached = lookup_game(view, game_id, snapshot.version)
+        if cached is None:
+            return jsonify({"error": "Game not found"}), 404
+        return send_response("game", cached)
     except Exception as e:
         print(f"Error fetching game details: {e}")
         return jsonify({"error": str(e)}), 500
 
-if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+@app.route('/api/games')
+@app.route('/api/teams/<team>/games')
+def get_games(team=None):
+    # Bulk game details: ?ids=a,b,c -> {"games": {id: details}, "missing": [ids]}
+    ids = sorted({i.strip() for i in request.args.get('ids', '').split(',') if i.strip()})
+    if not ids:
+        return jsonify({"error": "ids is required"}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"error": f"At most {MAX_BATCH_IDS} ids per request"}), 400
+
+    try:
+        snapshot = store.get()
+        view = resolve_team(snapshot, team)
+        if view is None:
+            return jsonify({"error": "Team not found"}), 404
+
+        validators = cache_validators(view, "games", ",".join(ids))
+        if is_not_modified(*validators):
+            return send_response("game", CachedResponse(None, validators, 304))
+
+        # Spliced from the per-game bodies rather than memoized: id sets are
+        # client-controlled and rarely repeat. Same bytes as dump_body would
+        # give, since both are compact and key-sorted.
+        games = []
+        missing = []
+        for game_id in ids:
+            cached = lookup_game(view, game_id, snapshot.version)
+            if cached is None:
+                missing.append(game_id)
+            else:
+                games.append(json.dumps(game_id).encode('utf-8') + b':' + cached.encoded.identity.rstrip(b'\n'))
+        body = (b'{"games":{' + b','.join(games) + b'},"missing":'
+                + json.dumps(missing, separators=(',', ':')).encode('utf-8') + b'}\n')
+        return send_response("game", CachedResponse(EncodedBody(body), validators, 200))
+    except Exception as e:
+        print(f"Error fetching games: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/stream')
+def stream_events():
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+
+    def generate():
+        body, cursor = event_log.open(last_event_id)
+        yield body
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            # Notice regenerated data files even when no request is reloading the store
+            store.get()
+            if event_log.wait(cursor, CHECK_INTERVAL):
+                body, cursor = event_log.read(cursor)
+            elif time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+                body = HEARTBEAT
+            else:
+                continue
+            yield body
+            last_sent = time.monotonic()
+
+    return app.response_class(generate(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def debug_routes_enabled():
+    return app.debug or bool(os.environ.get(DEBUG_ROUTES_ENV))
+
+@app.route('/api/debug/cache')
+def get_cache_state():
+    if not debug_routes_enabled():
+        return jsonify({"error": "Not found"}), 404
+    snapshot = store.current()
+    return jsonify({
+        "snapshot": {"version": snapshot.version, "loaded_at": snapshot.loaded_at},
+        "responses": response_cache.state(),
+        "games": game_cache.state(),
+        "rendered": rendered_cache.state(),
+        "live": live_poller.state() if live_poller else None,
+        "events": event_log.state(),
+    })
+
+@app.route('/metrics')
+def get_metrics():
+    return app.response_class(registry.render(), content_type=CONTENT_TYPE,
+                              headers={'Cache-Control': 'no-store'})
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,226 @@
+"""Every game generate_data.py has seen, across seasons, in SQLite.
+
+schedule.json and teams/*.json only hold the current season and are
+rewritten on every run; the archive keeps one row per (team, game) forever,
+so head-to-head history can reach back past this season. Past seasons can be
+backfilled with ``generate_data.py --backfill``. The API opens it read-only.
+
+What gets committed is archive.jsonl: a revision header, then one
+``[team_id, season, game]`` line per row sorted by team and game id, so a
+daily run diffs as the games that changed. archive.sqlite is a local copy
+rebuilt from it whenever the revisions differ.
+"""
+import json
+import os
+import sqlite3
+import threading
+import urllib.parse
+
+ARCHIVE_FILE = 'archive.sqlite'
+ARCHIVE_EXPORT_FILE = 'archive.jsonl'
+
+# Earlier-season head-to-head games returned per matchup
+H2H_LIMIT = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    team_id INTEGER NOT NULL,
+    game_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    date TEXT NOT NULL,
+    opponent_id INTEGER NOT NULL,
+    wl TEXT,
+    score TEXT,
+    game TEXT NOT NULL,
+    PRIMARY KEY (team_id, game_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS games_by_opponent ON games (team_id, opponent_id, date);
+CREATE INDEX IF NOT EXISTS games_by_season ON games (team_id, season, date);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+"""
+
+# Unchanged rows are skipped, so a rerun with the same data doesn't touch the file
+UPSERT = """
+INSERT INTO games (team_id, game_id, season, date, opponent_id, wl, score, game)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (team_id, game_id) DO UPDATE SET
+    season = excluded.season, date = excluded.date, opponent_id = excluded.opponent_id,
+    wl = excluded.wl, score = excluded.score, game = excluded.game
+WHERE games.game IS NOT excluded.game
+"""
+
+INSERT = "INSERT INTO games (team_id, game_id, season, date, opponent_id, wl, score, game) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+EXPORT_ROWS = "SELECT team_id, season, game FROM games ORDER BY team_id, game_id"
+
+HEAD_TO_HEAD = """
+SELECT date, score, wl FROM games
+WHERE team_id = ? AND opponent_id = ? AND wl IS NOT NULL AND date < ?
+ORDER BY date DESC LIMIT ?
+"""
+
+
+def restore_row(line):
+    # An export line back into a games row. The game column is sliced out of
+    # the line as written by export() instead of being re-encoded.
+    team_id, season, game = json.loads(line)
+    prefix = len(f"[{team_id}, {json.dumps(season)}, ")
+    return (team_id, str(game['id']), season, game['date'], int(game.get('opponent_id') or 0),
+            game.get('wl') or None, game.get('score'), line.rstrip('\n')[prefix:-1])
+
+
+class Archive:
+    def __init__(self, path, readonly=True):
+        self.path = path
+        if readonly:
+            uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            # ':memory:' too, for an archive restored from the export
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # Bumped by every upsert that changed a row; part of the data version
+        self.revision = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def upsert(self, rows):
+        """Insert or update (team_id, season, game) rows in one transaction.
+
+        Returns the number of rows that changed.
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(UPSERT, (
+                (team_id, str(game['id']), season, game['date'], int(game.get('opponent_id') or 0),
+                 game.get('wl') or None, game.get('score'), json.dumps(game, sort_keys=True))
+                for team_id, season, game in rows
+            ))
+            changed = self._conn.total_changes - before
+            if changed:
+                self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+                self.revision += 1
+        return changed
+
+    def export(self, path):
+        """Write every row to path as sorted JSON lines; returns whether it changed."""
+        with self._lock:
+            rows = self._conn.execute(EXPORT_ROWS).fetchall()
+        lines = [json.dumps({"revision": self.revision})]
+        lines += [f"[{team_id}, {json.dumps(season)}, {game}]" for team_id, season, game in rows]
+        body = ("\n".join(lines) + "\n").encode('utf-8')
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == body:
+                    return False
+        except OSError:
+            pass
+        with open(path + '.tmp', 'wb') as f:
+            f.write(body)
+        os.replace(path + '.tmp', path)
+        return True
+
+    def restore(self, path):
+        """Load an export into this (empty) archive, keeping its revision."""
+        with open(path, 'r', encoding='utf-8') as f:
+            revision = json.loads(f.readline())['revision']
+            rows = [restore_row(line) for line in f if line.strip()]
+        with self._lock, self._conn:
+            self._conn.executemany(INSERT, rows)
+            self._conn.execute("UPDATE meta SET value = ? WHERE key = 'revision'", (revision,))
+            self.revision = revision
+
+    def seasons(self, team_id):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT season FROM games WHERE team_id = ?", (team_id,))
+            return {season for (season,) in rows}
+
+    def head_to_head(self, team_id, opponent_id, before, limit=H2H_LIMIT):
+        """Played games against opponent_id dated before ``before``, most recent first."""
+        with self._lock:
+            rows = self._conn.execute(HEAD_TO_HEAD, (team_id, int(opponent_id or 0), before, limit)).fetchall()
+        return tuple({"date": date, "score": score, "wl": wl} for date, score, wl in rows)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class ExportedArchive:
+    """An archive.jsonl export, restored into memory on first use.
+
+    Restoring is linear in the history kept (about 1.5 s for 20 seasons of
+    every team), so the API doesn't pay it on reload or cold start: only the
+    revision line is read up front, and the first earlier-season lookup
+    restores the rest.
+    """
+
+    def __init__(self, path, revision):
+        self.path = path
+        self.revision = revision
+        self._archive = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self._archive is None:
+                archive = Archive(':memory:', readonly=False)
+                try:
+                    archive.restore(self.path)
+                except Exception as e:
+                    # Serve without earlier seasons, as if there were no archive
+                    print(f"Error restoring {ARCHIVE_EXPORT_FILE}: {e}")
+                    archive.close()
+                    archive = Archive(':memory:', readonly=False)
+                self._archive = archive
+            return self._archive
+
+    def seasons(self, team_id):
+        return self._open().seasons(team_id)
+
+    def head_to_head(self, team_id, opponent_id, before, limit=H2H_LIMIT):
+        return self._open().head_to_head(team_id, opponent_id, before, limit)
+
+    def __len__(self):
+        return len(self._open())
+
+    def close(self):
+        with self._lock:
+            if self._archive is not None:
+                self._archive.close()
+
+
+def export_revision(path):
+    # Revision in an export's header line, or None if there is no export
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.loads(f.readline())['revision']
+    except FileNotFoundError:
+        return None
+
+
+def load_archive(data_dir):
+    """Read-only Archive for the data directory, or None if there isn't one.
+
+    archive.sqlite is used when it matches the export (generate_data.py
+    keeps them together locally); otherwise, e.g. on a fresh checkout, the
+    export is restored into memory when first queried.
+    """
+    path = os.path.join(data_dir, ARCHIVE_FILE)
+    export_path = os.path.join(data_dir, ARCHIVE_EXPORT_FILE)
+    try:
+        revision = export_revision(export_path)
+        if os.path.exists(path):
+            archive = Archive(path)
+            if revision is None or archive.revision == revision:
+                return archive
+            archive.close()
+        if revision is None:
+            return None
+        return ExportedArchive(export_path, revision)
+    except Exception as e:
+        print(f"Error loading {ARCHIVE_FILE}: {e}")
+        return None
@@ -0,0 +1,103 @@
+"""Check that server memory stays flat under a flood of client-controlled keys.
+
+    python backend/benchmarks/cache_memory.py
+    python backend/benchmarks/cache_memory.py --requests 20000
+
+Serves a 1x synthetic dataset through the Flask test client. It first fills
+the bounded caches: every real game of every team, random game ids (negative
+entries) and distinct paged-schedule queries (memoized bodies). It then sends
+the same mix again with fresh random keys. Traced memory after the flood must
+stay within --tolerance of the level after the warm-up, and each cache
+within its own limits. Prints one JSON object and exits 1 on a regression.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DEFAULT_REQUESTS = 6000
+DEFAULT_TOLERANCE = 2 * 1024 * 1024
+
+
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def flood(client, urls):
+    for url in urls:
+        client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+
+
+def random_urls(rng, team_ids, count):
+    # Half unknown game ids, half distinct paged-schedule queries
+    urls = []
+    for i in range(count):
+        team = rng.choice(team_ids)
+        if i % 2:
+            urls.append(f"/api/teams/{team}/game/{rng.randrange(10 ** 9):010d}")
+        else:
+            start = f"2025-{rng.randint(10, 12)}-{rng.randint(1, 28):02d}"
+            urls.append(f"/api/teams/{team}/schedule?from={start}&limit={rng.randint(1, 100)}")
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that cache memory is bounded under random keys")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help="requests per phase")
+    parser.add_argument('--tolerance', type=int, default=DEFAULT_TOLERANCE, help="bytes of growth allowed")
+    parser.add_argument('--data-dir', help="existing dataset to serve (default: a fresh 1x synthetic one)")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir
+    if data_dir is None:
+        from benchmarks.synthetic import write_dataset
+        data_dir = tempfile.mkdtemp(prefix='cache-memory-')
+        write_dataset(data_dir, 1)
+    os.environ['WARRIORS_DATA_DIR'] = data_dir
+
+    import app
+    client = app.app.test_client()
+    snapshot = app.store.get()
+    team_ids = sorted(snapshot.teams)
+    real = [f"/api/teams/{team_id}/game/{game_id}"
+            for team_id, view in snapshot.teams.items() for game_id in view.index.by_id]
+    rng = random.Random(7)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    flood(client, real + random_urls(rng, team_ids, args.requests))
+    warm = traced_bytes()
+    flood(client, real + random_urls(rng, team_ids, args.requests))
+    after = traced_bytes()
+    seconds = time.perf_counter() - start
+    tracemalloc.stop()
+
+    caches = {cache.name: cache.state() for cache in app.BOUNDED_CACHES}
+    within_limits = all(c['entries'] <= c['max_entries'] and c['bytes'] <= c['max_bytes'] for c in caches.values())
+    growth = after - warm
+    ok = growth <= args.tolerance and within_limits
+    print(json.dumps({
+        "benchmark": "cache_memory",
+        "requests": 2 * (len(real) + args.requests),
+        "seconds": round(seconds, 2),
+        "traced_bytes_warm": warm,
+        "traced_bytes_after": after,
+        "growth_bytes": growth,
+        "tolerance_bytes": args.tolerance,
+        "caches": {name: {k: c[k] for k in ('entries', 'bytes', 'max_entries', 'max_bytes')}
+                   for name, c in caches.items()},
+        "ok": ok,
+    }))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
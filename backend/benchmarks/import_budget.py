@@ -0,0 +1,80 @@
+"""Fail if importing the API gets slow or pulls in the ingest stack.
+
+    python backend/benchmarks/import_budget.py              # default budget
+    python backend/benchmarks/import_budget.py --budget 0.4
+
+Each sample imports app.py in a fresh interpreter (so nothing is cached in
+sys.modules) and times it; the median is compared against the budget. The
+ingest-only modules must not be loaded at all, whatever the timing. Prints
+one JSON object and exits 1 on a regression.
+
+The app serves a 1x synthetic dataset with ARCHIVE_SEASONS earlier seasons
+in archive.jsonl, as a deployment with years of history would have, unless
+--data-dir points at another one.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+# Seconds; the app imported in ~0.7s with pandas/nba_api and ~0.22s without
+DEFAULT_BUDGET = 0.5
+
+# Earlier seasons of every team in the default dataset's archive
+ARCHIVE_SEASONS = 20
+
+# Used by generate_data.py only; the serving path must never import them
+FORBIDDEN_MODULES = ('pandas', 'numpy', 'nba_api', 'requests', 'ijson')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(m for m in sys.modules if '.' not in m)}))
+"""
+
+
+def sample(data_dir):
+    env = dict(os.environ, WARRIORS_DATA_DIR=data_dir)
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check app.py import time against a budget")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="median seconds allowed")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--data-dir', help="dataset to serve (default: a fresh synthetic one with an archive)")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir
+    if data_dir is None:
+        from benchmarks.synthetic import write_dataset
+        data_dir = tempfile.mkdtemp(prefix='import-budget-')
+        write_dataset(data_dir, 1, archive_seasons=ARCHIVE_SEASONS)
+
+    samples = [sample(data_dir) for _ in range(args.runs)]
+    median = statistics.median(s['seconds'] for s in samples)
+    loaded = sorted(set(FORBIDDEN_MODULES) & set(samples[0]['modules']))
+    ok = median <= args.budget and not loaded
+    print(json.dumps({
+        "benchmark": "import_budget",
+        "median_seconds": round(median, 4),
+        "budget_seconds": args.budget,
+        "forbidden_loaded": loaded,
+        "data_dir": data_dir,
+        "ok": ok,
+    }))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Benchmark the generate_data.py parsers against a recorded league feed.
+
+    python backend/benchmarks/parsing.py FIXTURE.json
+    python backend/benchmarks/parsing.py FIXTURE.json --repeat 9
+
+FIXTURE is a scheduleLeagueV2.json recording (schedule_parse.py --record) or
+the league_feed.json of a synthetic dataset. parse_game_datetime and
+parse_result are timed per call over every game in the feed.
+get_schedule_from_cdn is run against a local HTTP server replaying the
+fixture with an ETag. It runs once per parser (stream/tree) and once as a
+conditional request that gets a 304. Every sample runs in a fresh
+subprocess so peak RSS belongs to that case alone. Prints one JSON object
+per case.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from schedule_parse import peak_rss_kb
+
+CASES = ('parse_game_datetime', 'parse_result', 'cdn_stream', 'cdn_tree', 'cdn_304')
+MICRO_PASSES = 5
+
+
+def feed_games(fixture):
+    with open(fixture, 'rb') as f:
+        payload = json.load(f)
+    return [game for day in payload['leagueSchedule']['gameDates'] for game in day['games']]
+
+
+def fixture_etag(fixture):
+    digest = hashlib.sha256()
+    with open(fixture, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()[:16]}"'
+
+
+def serve_fixture(fixture):
+    """Serve the fixture at every path; returns (server, url)."""
+    etag = fixture_etag(fixture)
+    size = os.path.getsize(fixture)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(size))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            with open(fixture, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, 1 << 16)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/scheduleLeagueV2.json'
+
+
+def time_calls(fn, items):
+    # Best-of-passes time per call, in microseconds
+    per_call = []
+    for _ in range(MICRO_PASSES):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        per_call.append((time.perf_counter() - start) * 1e6 / len(items))
+    return min(per_call)
+
+
+def run_micro(case, fixture):
+    import generate_data
+
+    games = feed_games(fixture)
+    if case == 'parse_game_datetime':
+        us = time_calls(generate_data.parse_game_datetime, games)
+    else:
+        sides = [(g.get('homeTeam', {}), g.get('awayTeam', {}), g.get('gameStatus')) for g in games]
+        us = time_calls(lambda s: generate_data.parse_result(s[0], s[1], True, s[2]), sides)
+    return {"calls": len(games), "us_per_call": us}
+
+
+def run_cdn(case, fixture):
+    import generate_data
+
+    server, generate_data.SCHEDULE_URL = serve_fixture(fixture)
+    validators = {'etag': fixture_etag(fixture)} if case == 'cdn_304' else None
+    before = peak_rss_kb()
+    start = time.perf_counter()
+    # get_schedule_from_cdn prints progress; keep stdout for the result line
+    with contextlib.redirect_stdout(sys.stderr):
+        schedules, _, _, _ = generate_data.get_schedule_from_cdn(validators, stream=(case != 'cdn_tree'))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    if case == 'cdn_304':
+        parser = None
+    else:
+        parser = 'stream' if case == 'cdn_stream' and generate_data.ijson is not None else 'tree'
+    return {
+        "seconds": elapsed,
+        "peak_rss_delta_kb": peak_rss_kb() - before,
+        "games": sum(len(games) for games in schedules.values()) if schedules else 0,
+        "parser": parser,
+    }
+
+
+def run_once(case, fixture):
+    result = run_micro(case, fixture) if case.startswith('parse_') else run_cdn(case, fixture)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the schedule parsers on a recorded feed")
+    parser.add_argument('fixture')
+    parser.add_argument('--repeat', type=int, default=5, help="subprocess samples per case")
+    parser.add_argument('--cases', default=','.join(CASES), help="comma-separated subset of " + ', '.join(CASES))
+    parser.add_argument('--run', choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    fixture = os.path.abspath(args.fixture)
+    if args.run:
+        run_once(args.run, fixture)
+        return
+
+    size = os.path.getsize(fixture)
+    for case in args.cases.split(','):
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), fixture, '--run', case],
+                                 check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        result = {"benchmark": "parsing", "case": case, "fixture_bytes": size, "repeat": args.repeat}
+        if case.startswith('parse_'):
+            samples = [r["us_per_call"] for r in runs]
+            result.update(calls=runs[0]["calls"], median_us_per_call=round(statistics.median(samples), 4),
+                          min_us_per_call=round(min(samples), 4),
+                          calls_per_second=round(1e6 / statistics.median(samples)))
+        else:
+            samples = [r["seconds"] for r in runs]
+            result.update(games=runs[0]["games"], parser=runs[0]["parser"],
+                          median_seconds=round(statistics.median(samples), 4),
+                          max_seconds=round(max(samples), 4),
+                          median_peak_rss_delta_kb=statistics.median(r["peak_rss_delta_kb"] for r in runs))
+        print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""Latency, throughput and memory of the API routes against a data directory.
+
+    python backend/benchmarks/routes.py DATA_DIR --mode client     # Flask test client, in-process
+    python backend/benchmarks/routes.py DATA_DIR --mode server     # real HTTP server, several workers
+
+Client mode imports app.py with WARRIORS_DATA_DIR=DATA_DIR (so startup is
+measured too) and times each request through the test client. Server mode
+starts gunicorn when it is installed. Otherwise it uses a small prefork
+server: the app is loaded once, then N forked werkzeug workers share one
+listening socket. Either way the server is driven over HTTP from concurrent
+connections. Prints one JSON object per route plus one for startup.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+HEADERS = {'Accept-Encoding': 'br, gzip'}
+ROUTES = ('last_game', 'schedule', 'game')
+
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+    return {
+        "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 4), "mean_ms": round(statistics.fmean(ordered), 4),
+    }
+
+
+def rss_kb(pid='self'):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def tree_rss_kb(pid):
+    # RSS of a process and all its descendants (Linux only)
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        total += rss_kb(p) or 0
+        try:
+            with open(f'/proc/{p}/task/{p}/children') as f:
+                stack.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+    return total
+
+
+def game_ids(data_dir, count, seed=7):
+    # data_store isn't imported here: it reads WARRIORS_DATA_DIR on import
+    with open(os.path.join(data_dir, 'schedule.json')) as f:
+        schedule = json.load(f)
+    games = schedule['games'] if isinstance(schedule, dict) else schedule
+    ids = [str(g['id']) for g in games]
+    rng = random.Random(seed)
+    return [rng.choice(ids) for _ in range(count)]
+
+
+def route_urls(data_dir, count):
+    return {
+        'last_game': ['/api/last-game'] * count,
+        'schedule': ['/api/schedule'] * count,
+        'game': [f'/api/game/{game_id}' for game_id in game_ids(data_dir, count)],
+    }
+
+
+def run_client(data_dir, requests_per_route):
+    os.environ['WARRIORS_DATA_DIR'] = data_dir
+    start = time.perf_counter()
+    import app
+    startup = time.perf_counter() - start
+    results = [{"route": "startup", "seconds": round(startup, 4), "rss_kb": rss_kb()}]
+
+    client = app.app.test_client()
+    for route, urls in route_urls(data_dir, requests_per_route).items():
+        cold_start = time.perf_counter()
+        client.get(urls[0], headers=HEADERS)
+        cold_ms = (time.perf_counter() - cold_start) * 1000
+        samples = []
+        phase_start = time.perf_counter()
+        for url in urls:
+            t = time.perf_counter()
+            response = client.get(url, headers=HEADERS)
+            samples.append((time.perf_counter() - t) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+        elapsed = time.perf_counter() - phase_start
+        results.append({"route": route, "requests": len(urls), "cold_ms": round(cold_ms, 4),
+                        "rps": round(len(urls) / elapsed, 1), **percentiles(samples)})
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for result in results:
+        result["peak_rss_kb"] = peak
+    return results
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir, workers, port):
+    env = dict(os.environ, WARRIORS_DATA_DIR=data_dir, PYTHONUNBUFFERED='1')
+    try:
+        import gunicorn  # noqa: F401
+        cmd = [sys.executable, '-m', 'gunicorn', '--preload', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+               '--log-level', 'warning', 'app:app']
+        kind = 'gunicorn'
+    except ImportError:
+        cmd = [sys.executable, os.path.abspath(__file__), '--serve', str(port), '--workers', str(workers)]
+        kind = 'werkzeug-prefork'
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, kind
+
+
+def wait_ready(port, proc, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/last-game')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start in time")
+
+
+def drive(port, urls, concurrency):
+    # Each worker thread walks its share of the URLs on its own connection
+    samples = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local = []
+        for url in chunk:
+            t = time.perf_counter()
+            try:
+                conn.request('GET', url, headers=HEADERS)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                if response.will_close:
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local.append((time.perf_counter() - t) * 1000)
+        conn.close()
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(urls[i::concurrency],)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.perf_counter() - start
+
+
+def run_server(data_dir, requests_per_route, workers, concurrency, startup_timeout):
+    port = free_port()
+    start = time.perf_counter()
+    proc, kind = start_server(data_dir, workers, port)
+    try:
+        wait_ready(port, proc, startup_timeout)
+        results = [{"route": "startup", "server": kind, "workers": workers,
+                    "seconds": round(time.perf_counter() - start, 4), "server_rss_kb": tree_rss_kb(proc.pid)}]
+        for route, urls in route_urls(data_dir, requests_per_route).items():
+            samples, errors, elapsed = drive(port, urls, concurrency)
+            results.append({"route": route, "server": kind, "workers": workers, "concurrency": concurrency,
+                            "requests": len(urls), "errors": len(errors), "rps": round(len(samples) / elapsed, 1),
+                            "server_rss_kb": tree_rss_kb(proc.pid), **percentiles(samples or [0.0])})
+        return results
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def prefork_serve(port, workers):
+    # gunicorn-style sync workers: preload the app, bind once, fork, and let
+    # the kernel spread accept() calls across the children
+    from werkzeug.serving import BaseWSGIServer
+
+    class Server(BaseWSGIServer):
+        def get_request(self):
+            # werkzeug writes headers and body separately; without NODELAY,
+            # Nagle plus delayed ACKs add ~40ms to every response
+            conn, addr = super().get_request()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return conn, addr
+
+    os.chdir(BACKEND_DIR)
+    import app
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', port))
+    listener.listen(1024)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            Server('127.0.0.1', port, app.app, fd=listener.fileno()).serve_forever()
+            os._exit(0)
+        children.append(pid)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, 15)
+            except OSError:
+                pass
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        # Internal: the server process started by run_server()
+        prefork_serve(int(sys.argv[2]), int(sys.argv[4]))
+        return
+    parser = argparse.ArgumentParser(description="Benchmark the API routes against a data directory")
+    parser.add_argument('data_dir')
+    parser.add_argument('--mode', choices=('client', 'server'), default='client')
+    parser.add_argument('--requests', type=int, default=2000, help="requests per route")
+    parser.add_argument('--workers', type=int, default=4, help="server mode: worker processes")
+    parser.add_argument('--concurrency', type=int, default=16, help="server mode: concurrent connections")
+    parser.add_argument('--startup-timeout', type=float, default=600)
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data_dir)
+    if args.mode == 'client':
+        results = run_client(data_dir, args.requests)
+    else:
+        results = run_server(data_dir, args.requests, args.workers, args.concurrency, args.startup_timeout)
+    for result in results:
+        print(json.dumps({"benchmark": "routes", "mode": args.mode, **result}))
+
+
+if __name__ == '__main__':
+    main()
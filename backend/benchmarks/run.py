@@ -0,0 +1,173 @@
+"""Run the benchmark suite at several dataset scales and save one JSON report.
+
+    python backend/benchmarks/run.py --out bench-main.json
+    python backend/benchmarks/run.py --scales 1,10 --suites routes --out bench-branch.json
+    python backend/benchmarks/run.py --compare bench-main.json bench-branch.json
+
+Datasets come from synthetic.py. They are cached under --work-dir, so
+later runs (and runs from other commits) reuse the same inputs. Each suite
+runs in its own subprocess. The report holds the run metadata (commit,
+Python, platform), the datasets, and every result line tagged with its
+scale. --compare matches results between two reports and prints the change
+of each metric. With --fail-over PCT it exits 1 if anything got worse by
+more than PCT percent.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCH_DIR, '..', '..')
+SUITES = ('routes', 'parsing', 'import')
+DEFAULT_SCALES = '1,10,100'
+
+# Metrics --compare looks at; everything else (e.g. single-sample cold_ms) is context
+HIGHER_IS_BETTER = ('rps', 'calls_per_second')
+LOWER_IS_BETTER = (
+    'p50_ms', 'p90_ms', 'p99_ms', 'seconds', 'median_seconds', 'median_us_per_call',
+    'rss_kb', 'peak_rss_kb', 'server_rss_kb', 'median_peak_rss_delta_kb',
+)
+# Identity fields that tell apart results within a report
+KEY_FIELDS = ('benchmark', 'scale', 'mode', 'route', 'case', 'workers')
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def run_meta(args):
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+def ensure_dataset(work_dir, scale, artifacts):
+    name = f"scale-{scale}" + ('' if artifacts else '-noart')
+    out_dir = os.path.join(work_dir, name)
+    summary_path = os.path.join(out_dir, 'dataset.json')
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            return json.load(f)
+    # In a subprocess: children inherit ru_maxrss, so generating here would
+    # inflate every peak RSS reported after it
+    print(f"Generating {scale}x dataset in {out_dir}...", file=sys.stderr)
+    cmd = [os.path.join(BENCH_DIR, 'synthetic.py'), out_dir, '--scale', str(scale)]
+    summary = run_suite(cmd if artifacts else cmd + ['--no-artifacts'])[-1]
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f)
+    return summary
+
+
+def run_suite(cmd):
+    # Suites print one JSON object per result; their other output goes to stderr
+    print("  " + " ".join(os.path.basename(c) for c in cmd[1:]), file=sys.stderr)
+    out = subprocess.run([sys.executable] + cmd, check=True, capture_output=True, text=True).stdout
+    return [json.loads(line) for line in out.splitlines() if line.startswith('{')]
+
+
+def run_all(args):
+    scales = [int(s) for s in args.scales.split(',')]
+    suites = args.suites.split(',')
+    report = {"meta": run_meta(args), "datasets": [], "results": []}
+    start = time.perf_counter()
+
+    if 'import' in suites:
+        report["results"].extend(run_suite([os.path.join(BENCH_DIR, 'import_budget.py')]))
+    for scale in scales:
+        dataset = ensure_dataset(args.work_dir, scale, not args.no_artifacts)
+        report["datasets"].append(dataset)
+        results = []
+        if 'parsing' in suites:
+            results += run_suite([os.path.join(BENCH_DIR, 'parsing.py'),
+                                  os.path.join(dataset["dir"], 'league_feed.json'), '--repeat', str(args.repeat)])
+        if 'routes' in suites:
+            for mode in ('client', 'server'):
+                results += run_suite([os.path.join(BENCH_DIR, 'routes.py'), dataset["dir"], '--mode', mode,
+                                      '--requests', str(args.requests), '--workers', str(args.workers)])
+        for result in results:
+            result["scale"] = scale
+        report["results"].extend(results)
+
+    report["meta"]["seconds"] = round(time.perf_counter() - start, 1)
+    return report
+
+
+def result_key(result):
+    return tuple((field, result[field]) for field in KEY_FIELDS if field in result)
+
+
+def compare(old_path, new_path, fail_over=None):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"old: {old['meta'].get('commit')}  new: {new['meta'].get('commit')}")
+    old_results = {result_key(r): r for r in old["results"]}
+    regressions = 0
+    for result in new["results"]:
+        key = result_key(result)
+        before = old_results.get(key)
+        if before is None:
+            continue
+        label = " ".join(str(value) for _, value in key)
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            a, b = before.get(metric), result.get(metric)
+            if not isinstance(a, (int, float)) or not isinstance(b, (int, float)) or not a:
+                continue
+            change = (b - a) / a * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ''
+            if fail_over is not None and worse > fail_over:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{label:<40} {metric:<26} {a:>12.4g} {b:>12.4g} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmarks at several scales")
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help="comma-separated seasons per dataset")
+    parser.add_argument('--suites', default=','.join(SUITES), help="comma-separated subset of " + ', '.join(SUITES))
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'warriors-bench'))
+    parser.add_argument('--no-artifacts', action='store_true', help="datasets without pre-rendered responses")
+    parser.add_argument('--requests', type=int, default=2000, help="routes: requests per route")
+    parser.add_argument('--workers', type=int, default=4, help="routes: server worker processes")
+    parser.add_argument('--repeat', type=int, default=5, help="parsing: subprocess samples per case")
+    parser.add_argument('--out', help="write the report here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two reports")
+    parser.add_argument('--fail-over', type=float, help="--compare: exit 1 on a regression above this percent")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, fail_over=args.fail_over)
+        sys.exit(1 if regressions else 0)
+
+    report = run_all(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.out}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
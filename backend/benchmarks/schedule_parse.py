@@ -0,0 +1,96 @@
+"""Compare full-document vs streaming parsing of the league schedule feed.
+
+    python backend/benchmarks/schedule_parse.py --record feed.json   # save the live CDN feed
+    python backend/benchmarks/schedule_parse.py feed.json            # benchmark both parsers
+
+Each run happens in a fresh subprocess so peak RSS isn't polluted by the
+other mode. Prints one JSON object per mode.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MODES = ('tree', 'stream')
+
+
+def peak_rss_kb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_once(mode, fixture):
+    import generate_data
+
+    before = peak_rss_kb()
+    start = time.perf_counter()
+    if mode == 'tree':
+        with open(fixture, 'rb') as f:
+            schedules, _, _ = generate_data.parse_league_schedule(json.loads(f.read()))
+    else:
+        with open(fixture, 'rb') as f:
+            schedules, _, _ = generate_data.stream_league_schedule(f)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "mode": mode,
+        "seconds": elapsed,
+        "peak_rss_delta_kb": peak_rss_kb() - before,
+        "games": sum(len(games) for games in schedules.values()),
+    }))
+
+
+def record(path):
+    import requests
+    from generate_data import SCHEDULE_URL
+
+    response = requests.get(SCHEDULE_URL, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
+    response.raise_for_status()
+    with open(path, 'wb') as f:
+        f.write(response.content)
+    print(f"Recorded {len(response.content)} bytes to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixture', help="Recorded scheduleLeagueV2.json")
+    parser.add_argument('--record', action='store_true', help="Download the live feed to FIXTURE and exit.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixture)
+        return
+    if args.run:
+        run_once(args.run, args.fixture)
+        return
+
+    size = os.path.getsize(args.fixture)
+    for mode in MODES:
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), args.fixture, '--run', mode],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        print(json.dumps({
+            "benchmark": "schedule_parse",
+            "mode": mode,
+            "fixture_bytes": size,
+            "games": runs[0]["games"],
+            "median_seconds": statistics.median(r["seconds"] for r in runs),
+            "median_peak_rss_delta_kb": statistics.median(r["peak_rss_delta_kb"] for r in runs),
+            "repeat": args.repeat,
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Check that the mmap'd snapshot.bin serves exactly what the JSON files do.
+
+    python backend/benchmarks/snapshot_roundtrip.py
+    python backend/benchmarks/snapshot_roundtrip.py --data-dir /tmp/syn10
+
+Loads a dataset (by default a fresh 1x synthetic one with two archived
+seasons) twice: as written, where every team's schedule and the team
+details come from snapshot.bin, and from a copy without snapshot.bin, where
+they are parsed from the JSON files. For every team it compares the games,
+sort keys, tip-offs, id lookups, head-to-head lists, schedule windows, the
+last game and the game details body of every game. Prints one JSON object
+and exits 1 on any difference.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from data_store import SNAPSHOT_FILE, DataStore, MappedScheduleIndex
+from responses import dump_body, game_details_body, last_game_body
+
+ARCHIVE_SEASONS = 2
+WINDOW_LIMIT = 10
+
+
+def canonical(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def team_results(view):
+    """Everything the routes read from one team's view, keyed by what it is."""
+    index = view.index
+    results = {
+        "version": view.version,
+        "games": canonical(list(index.games)),
+        "keys": canonical(list(index.keys)),
+        "tips": canonical(list(index.tips)),
+        "positions": canonical(dict(index.positions)),
+        "by_id": canonical(dict(index.by_id)),
+        "played_by_opponent": canonical({opp: list(games) for opp, games in index.played_by_opponent.items()}),
+        "last_result_pos": canonical(index.last_result_pos),
+        "last_game_timeline": canonical(index.last_game_timeline()),
+        "team_details": canonical(dict(view.team_details)),
+    }
+    last = index.last_game(max(index.keys, default=0))
+    results["last_game"] = last and dump_body(last_game_body(last, view.name, view.tricode)).decode('utf-8')
+    for pos in range(0, len(index), WINDOW_LIMIT):
+        game_id = str(index.games[pos]['id'])
+        results[f"window_from:{pos}"] = canonical(index.window(start=index.keys[pos], limit=WINDOW_LIMIT))
+        results[f"window_after:{game_id}"] = canonical(index.window(after_id=game_id, limit=WINDOW_LIMIT))
+        results[f"window_unplayed:{pos}"] = canonical(
+            index.window(start=index.keys[pos], limit=WINDOW_LIMIT, unplayed_only=True))
+    for game_id in index.by_id:
+        game = index.game(game_id)
+        body = game_details_body(game, view.team_details, view.head_to_head(game['opponent_id']))
+        results[f"details:{game_id}"] = dump_body(body).decode('utf-8')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that snapshot.bin round-trips the JSON data files")
+    parser.add_argument('--data-dir', help="existing dataset to check (default: a fresh 1x synthetic one)")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir
+    if data_dir is None:
+        from benchmarks.synthetic import write_dataset
+        data_dir = tempfile.mkdtemp(prefix='snapshot-roundtrip-')
+        write_dataset(data_dir, 1, artifacts=False, archive_seasons=ARCHIVE_SEASONS)
+    json_dir = tempfile.mkdtemp(prefix='snapshot-roundtrip-json-')
+    shutil.copytree(data_dir, json_dir, dirs_exist_ok=True, ignore=shutil.ignore_patterns(SNAPSHOT_FILE))
+
+    mapped = DataStore(data_dir).reload()
+    parsed = DataStore(json_dir).reload()
+    mapped_teams = sum(isinstance(view.index, MappedScheduleIndex) for view in mapped.teams.values())
+    parsed_teams = sum(isinstance(view.index, MappedScheduleIndex) for view in parsed.teams.values())
+
+    mismatches = []
+    compared = 0
+    for team_id in sorted(set(mapped.teams) | set(parsed.teams)):
+        if team_id not in mapped.teams or team_id not in parsed.teams:
+            mismatches.append(f"{team_id}:missing")
+            continue
+        expected = team_results(parsed.teams[team_id])
+        actual = team_results(mapped.teams[team_id])
+        compared += len(expected)
+        mismatches += [f"{team_id}:{key}" for key in sorted(set(expected) | set(actual))
+                       if expected.get(key) != actual.get(key)]
+    shutil.rmtree(json_dir, ignore_errors=True)
+
+    ok = not mismatches and mapped_teams == len(mapped.teams) and parsed_teams == 0
+    print(json.dumps({
+        "benchmark": "snapshot_roundtrip",
+        "data_dir": data_dir,
+        "teams": len(mapped.teams),
+        "mapped_teams": mapped_teams,
+        "games": sum(len(view.index) for view in mapped.teams.values()),
+        "compared": compared,
+        "mismatches": mismatches[:20],
+        "ok": ok,
+    }))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
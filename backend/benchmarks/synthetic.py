@@ -0,0 +1,192 @@
+"""Synthetic league-scale datasets for the benchmarks.
+
+    python backend/benchmarks/synthetic.py OUT_DIR --scale 10
+
+Scale N means N full seasons of all 30 teams (1230 games each). The newest
+season is 60% played. The league feed is written as league_feed.json in the
+scheduleLeagueV2 shape. The data files are then produced from it with the
+same generate_data.py writers the daily job uses: schedule.json,
+teams/*.json, team_details.json, response artifacts and snapshot.bin, plus
+archive.jsonl with --archive-seasons. The result can be served with WARRIORS_DATA_DIR=OUT_DIR.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from data_store import WARRIORS_ID, schedule_document
+
+TEAM_IDS = list(range(1610612737, 1610612767))
+GAMES_PER_TEAM = 82
+PLAYED_FRACTION = 0.6
+FIRST_SEASON = 2025
+
+
+def team_meta(team_id):
+    if team_id == WARRIORS_ID:
+        return "Golden State", "Warriors", "GSW"
+    n = team_id % 100
+    return f"City{n}", f"Team{n}", f"T{n:02d}"
+
+
+def feed_team(team_id, score):
+    city, name, tricode = team_meta(team_id)
+    return {"teamId": team_id, "teamCity": city, "teamName": name, "teamTricode": tricode,
+            "wins": 0, "losses": 0, "score": score, "seed": None}
+
+
+def season_games(season, rng):
+    # Round-robin pairings repeated until every team has 82 games
+    # (41 rounds of 15 games, twice), spread over ~165 days from late October
+    games = []
+    teams = TEAM_IDS[:]
+    rounds = []
+    for _ in range(GAMES_PER_TEAM // (len(teams) - 1) + 1):
+        for r in range(len(teams) - 1):
+            rotated = [teams[0]] + teams[1:][r:] + teams[1:][:r]
+            rounds.append([(rotated[i], rotated[-1 - i]) for i in range(len(teams) // 2)])
+    rounds = rounds[:GAMES_PER_TEAM]
+    start = datetime(season, 10, 21, tzinfo=timezone.utc)
+    for r, pairs in enumerate(rounds):
+        day = start + timedelta(days=r * 2)
+        for home, away in pairs:
+            if rng.random() < 0.5:
+                home, away = away, home
+            games.append((day + timedelta(hours=rng.choice([23, 26, 27])), home, away))
+    return games
+
+
+def feed_game(season, number, tip, home, away, done, rng):
+    est = tip - timedelta(hours=5)
+    return {
+        "gameId": f"00{season % 100:02d}{number:06d}",
+        "gameStatus": 3 if done else 1,
+        "gameStatusText": "Final" if done else "7:00 pm ET",
+        "gameLabel": "",
+        "gameDateEst": est.strftime("%Y-%m-%dT00:00:00Z"),
+        "gameTimeEst": "1900-01-01T19:00:00Z",
+        "gameDateTimeUTC": tip.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "arenaName": f"Arena {home % 100}",
+        "homeTeam": feed_team(home, rng.randint(90, 130) if done else 0),
+        "awayTeam": feed_team(away, rng.randint(90, 130) if done else 0),
+    }
+
+
+def league_feed(scale, seed=7):
+    rng = random.Random(seed)
+    dates = {}
+    game_number = 1
+    for s in range(scale):
+        season = FIRST_SEASON - scale + 1 + s
+        games = season_games(season, rng)
+        played_until = len(games) * PLAYED_FRACTION if s == scale - 1 else len(games)
+        for i, (tip, home, away) in enumerate(games):
+            game = feed_game(season, game_number, tip, home, away, i < played_until, rng)
+            game_number += 1
+            est = tip - timedelta(hours=5)
+            dates.setdefault(est.strftime("%m/%d/%Y 00:00:00"), []).append(game)
+    return {
+        "meta": {"version": 1},
+        "leagueSchedule": {
+            "seasonYear": f"{FIRST_SEASON}-{(FIRST_SEASON + 1) % 100:02d}",
+            "leagueId": "00",
+            "gameDates": [{"gameDate": day, "games": games} for day, games in dates.items()],
+        },
+    }
+
+
+def team_details(rng):
+    details = {}
+    for team_id in TEAM_IDS:
+        wins = rng.randint(10, 70)
+        details[str(team_id)] = {
+            "record": f"{wins}-{82 - wins}",
+            "scorers": [
+                {"name": f"Player {team_id % 100}-{i}", "ppg": round(rng.uniform(10, 35), 1),
+                 "img": f"https://cdn.nba.com/headshots/nba/latest/1040x760/{team_id * 10 + i}.png"}
+                for i in range(3)
+            ],
+        }
+    return details
+
+
+def archive_rows(seasons, first_season, seed=7):
+    # (team_id, season, game) rows for fully played seasons before first_season,
+    # normalized with the same code path as the daily job
+    import generate_data
+
+    rng = random.Random(seed + 1)
+    for season in range(first_season - seasons, first_season):
+        label = f"{season}-{(season + 1) % 100:02d}"
+        for number, (tip, home, away) in enumerate(season_games(season, rng), 1):
+            game = feed_game(season, number, tip, home, away, True, rng)
+            for team_id, _, record in generate_data.team_game_records(game):
+                yield team_id, label, record
+
+
+def write_dataset(out_dir, scale, artifacts=True, seed=7, archive_seasons=0):
+    """Writes the feed fixture and every data file; returns a summary dict.
+
+    archive_seasons adds that many fully played earlier seasons of every
+    team to archive.jsonl, as a long-running deployment would have.
+    """
+    import generate_data
+    from archive import ARCHIVE_EXPORT_FILE, Archive, load_archive
+
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    feed = league_feed(scale, seed)
+    feed_path = os.path.join(out_dir, 'league_feed.json')
+    with open(feed_path, 'w') as f:
+        json.dump(feed, f)
+
+    generate_data.DATA_DIR = out_dir
+    schedules, teams, _ = generate_data.parse_league_schedule(feed)
+    schedule_raw, _ = generate_data.write_json('schedule.json', schedule_document(schedules[WARRIORS_ID]))
+    generate_data.write_team_schedules(schedules, teams)
+    details_raw, _ = generate_data.write_json('team_details.json', team_details(random.Random(seed)))
+    archive = None
+    if archive_seasons:
+        built = Archive(':memory:', readonly=False)
+        built.upsert(archive_rows(archive_seasons, FIRST_SEASON - scale + 1, seed))
+        built.export(os.path.join(out_dir, ARCHIVE_EXPORT_FILE))
+        built.close()
+        archive = load_archive(out_dir)
+    if artifacts:
+        generate_data.write_response_artifacts(schedules[WARRIORS_ID], json.loads(details_raw),
+                                               schedule_raw, details_raw, archive)
+    generate_data.write_binary_snapshot(schedule_raw, details_raw, archive)
+    if archive is not None:
+        archive.close()
+    return {
+        "scale": scale,
+        "dir": out_dir,
+        "league_games": sum(len(d['games']) for d in feed['leagueSchedule']['gameDates']),
+        "team_games": len(schedules[WARRIORS_ID]),
+        "feed_bytes": os.path.getsize(feed_path),
+        "artifacts": artifacts,
+        "archive_seasons": archive_seasons,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic dataset for the benchmarks")
+    parser.add_argument('out_dir')
+    parser.add_argument('--scale', type=int, default=1, help="number of seasons")
+    parser.add_argument('--no-artifacts', action='store_true', help="skip pre-rendered response artifacts")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--archive-seasons', type=int, default=0,
+                        help="earlier seasons to put in archive.jsonl")
+    args = parser.parse_args()
+    print(json.dumps(write_dataset(args.out_dir, args.scale, not args.no_artifacts, args.seed,
+                                   args.archive_seasons)))
+
+
+if __name__ == '__main__':
+    main()
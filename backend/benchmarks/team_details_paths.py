@@ -0,0 +1,123 @@
+"""Check that the bulk and per-team team-details paths write the same file.
+
+    python backend/benchmarks/team_details_paths.py
+
+Runs generate_data.get_team_details() both ways against a local stub of the
+three stats.nba.com endpoints involved and compares the team_details.json
+bytes each would write. The stub has no traded players, the one case where
+the paths legitimately differ (see get_team_details_bulk). A second run
+breaks the bulk endpoints and checks that the per-team fallback only
+fetches the teams it was asked for. Prints one JSON object and exits 1 on
+a mismatch.
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+TEAM_IDS = list(range(1610612737, 1610612767))
+PLAYERS_PER_TEAM = 8
+SEASON = '2025-26'
+
+
+def player_rows():
+    # Deterministic stats with tied point totals, so tie order is exercised too
+    rows = []
+    for team_id in TEAM_IDS:
+        for i in range(PLAYERS_PER_TEAM):
+            gp = 20 + (team_id + i) % 15
+            pts = gp * (8 + (team_id * 7 + i * 3) % 20) if i != 3 else gp * (8 + (team_id * 7) % 20)
+            rows.append([team_id * 100 + i, f"Player {team_id % 100}-{i}", team_id, gp, pts])
+    return rows
+
+
+def record(team_id):
+    wins = team_id % 50
+    return wins, 82 - wins
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Set by the check: endpoints that answer 500 instead of data
+    broken = set()
+    requests = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        endpoint = parts.path.rsplit('/', 1)[-1].lower()
+        query = parse_qs(parts.query, keep_blank_values=True)
+        team_id = query.get('TeamID', [''])[0]
+        with self.lock:
+            self.requests.append((endpoint, team_id))
+        if endpoint in self.broken:
+            self.send_response(500)
+            self.end_headers()
+            return
+        if endpoint == 'leaguestandingsv3':
+            result_sets = [{"name": "Standings", "headers": ["TeamID", "WINS", "LOSSES"],
+                            "rowSet": [[t, *record(t)] for t in TEAM_IDS]}]
+        elif endpoint == 'teaminfocommon':
+            result_sets = [{"name": "TeamInfoCommon", "headers": ["TEAM_ID", "W", "L"],
+                            "rowSet": [[int(team_id), *record(int(team_id))]]},
+                           {"name": "AvailableSeasons", "headers": ["SEASON_ID"], "rowSet": []},
+                           {"name": "TeamSeasonRanks", "headers": ["TEAM_ID"], "rowSet": []}]
+        elif endpoint == 'leaguedashplayerstats':
+            rows = [row for row in player_rows() if not team_id or row[2] == int(team_id)]
+            result_sets = [{"name": "LeagueDashPlayerStats",
+                            "headers": ["PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "GP", "PTS"], "rowSet": rows}]
+        else:
+            result_sets = []
+        body = json.dumps({"resultSets": result_sets}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def details_bytes(details):
+    # What write_json('team_details.json', ...) would put on disk
+    return json.dumps(details, indent=2).encode('utf-8')
+
+
+def main():
+    import generate_data
+    from upstream import configure_stats_http
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    configure_stats_http(f"http://127.0.0.1:{server.server_port}/stats", cache_mode='off')
+
+    schedule = [{"opponent_id": team_id} for team_id in TEAM_IDS]
+    bulk = generate_data.get_team_details(schedule, SEASON, rate=50, bulk=True)
+    per_team = generate_data.get_team_details(schedule, SEASON, rate=50, bulk=False)
+    identical = details_bytes(bulk) == details_bytes(per_team)
+
+    only = set(TEAM_IDS[:3])
+    StubHandler.broken = {'leaguestandingsv3'}
+    StubHandler.requests.clear()
+    fallback = generate_data.get_team_details(schedule, SEASON, rate=50, bulk=True, only=only)
+    fetched = {int(team_id) for endpoint, team_id in StubHandler.requests if endpoint == 'teaminfocommon'}
+    server.shutdown()
+
+    ok = identical and len(bulk) == len(TEAM_IDS) and set(fallback) == only and fetched == only
+    print(json.dumps({
+        "benchmark": "team_details_paths",
+        "teams": len(bulk),
+        "identical": identical,
+        "fallback_teams_fetched": len(fetched),
+        "fallback_teams_requested": len(only),
+        "ok": ok,
+    }))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
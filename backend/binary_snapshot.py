@@ -0,0 +1,311 @@
+"""Compact binary form of every team's schedule + team_details.json for mmap.
+
+generate_data.py writes it next to the JSON files; the API maps it read-only,
+so every worker process shares one page-cache copy and records are decoded
+only when a request touches them.
+
+Layout (little-endian), all offsets from the start of the file:
+
+    header      MAGIC, format, data version, counts, section offsets
+    strings     u32 offsets[n_strings + 1] then the UTF-8 blob
+    games       GAME records, each team's in schedule order (sort key)
+    by_id       u32 positions within the team, sorted by game id; parallel to games
+    opponents   OPPONENT records sorted by team id within each team -> slice of h2h
+    h2h         u32 positions of played games, most recent first per opponent
+    teams       TEAM records sorted by team id -> slices of games and opponents
+    details     DETAIL records sorted by team id -> slice of scorers
+    scorers     SCORER records
+
+Each team section carries the version of the schedule file it was built
+from, so the API can tell which teams' JSON it may skip.
+
+String references are indexes into the string table; NONE marks a null.
+"""
+import mmap
+import struct
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+
+MAGIC = b'WSNB'
+FORMAT = 3
+
+NONE = 0xFFFFFFFF
+NO_TIP = -(2 ** 63)
+IS_HOME = 1
+
+HEADER = struct.Struct('<4sHH16s6i10I')
+GAME = struct.Struct('<9IiiqqB3x')
+OPPONENT = struct.Struct('<3I')
+TEAM = struct.Struct('<I16s5i')
+DETAIL = struct.Struct('<4I')
+SCORER = struct.Struct('<2Id')
+U32 = struct.Struct('<I')
+
+# Exactly the fields of a schema v2 game; anything else can't round-trip
+GAME_KEYS = {'id', 'date', 'time', 'opponent', 'opponent_id', 'isHome', 'location', 'score', 'wl', 'pts', 'plus_minus',
+             'tipoff', 'game_status', 'sort_key'}
+DETAIL_KEYS = {'record', 'scorers'}
+SCORER_KEYS = {'name', 'ppg', 'img'}
+
+
+class _Strings:
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def ref(self, value):
+        if value is None:
+            return NONE
+        if not isinstance(value, str):
+            raise TypeError(f"expected a string, got {value!r}")
+        if value not in self.index:
+            self.index[value] = len(self.values)
+            self.values.append(value)
+        return self.index[value]
+
+    def encode(self):
+        blobs = [v.encode('utf-8') for v in self.values]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return struct.pack(f'<{len(offsets)}I', *offsets), b''.join(blobs)
+
+
+def _int(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"expected an int, got {value!r}")
+    return value
+
+
+def _version(value):
+    return value.encode('ascii').ljust(16, b'\0')[:16]
+
+
+def build_snapshot(schedules, team_details, version):
+    """Encode every team's ordered v2 games (ScheduleIndex.games) and team details.
+
+    schedules maps team id -> (version of its schedule file, games); version
+    is the data version the whole file is stamped with. Returns the file
+    bytes, or None if the data has fields this format can't represent exactly.
+    """
+    strings = _Strings()
+    try:
+        records, by_id, opponents, h2h, teams = [], [], [], [], []
+        for team_id in sorted(schedules):
+            team_version, games = schedules[team_id]
+            first_game, first_opponent = len(records), len(opponents)
+            for game in games:
+                if set(game) != GAME_KEYS or not isinstance(game['isHome'], bool):
+                    return None
+                tip = game['tipoff']
+                records.append(GAME.pack(
+                    strings.ref(game['id']), strings.ref(game['date']), strings.ref(game['time']),
+                    strings.ref(game['opponent']), strings.ref(game['location']), strings.ref(game['score']),
+                    strings.ref(game['wl']), strings.ref(game['game_status']), _int(game['opponent_id']),
+                    _int(game['pts']), _int(game['plus_minus']),
+                    NO_TIP if tip is None else _int(tip), _int(game['sort_key']), IS_HOME if game['isHome'] else 0))
+
+            by_id.extend(sorted(range(len(games)), key=lambda i: str(games[i]['id'])))
+            played = {}
+            for i in range(len(games) - 1, -1, -1):
+                game = games[i]
+                if game['wl']:
+                    played.setdefault(game['opponent_id'], []).append(i)
+            for opp_id in sorted(played):
+                opponents.append(OPPONENT.pack(opp_id, len(h2h), len(played[opp_id])))
+                h2h.extend(played[opp_id])
+            last_result_pos = next((i for i in range(len(games) - 1, -1, -1) if games[i]['wl']), -1)
+            teams.append(TEAM.pack(_int(team_id), _version(team_version), first_game, len(games),
+                                   first_opponent, len(opponents) - first_opponent, last_result_pos))
+
+        details, scorers = [], []
+        for team_id in sorted(team_details, key=int):
+            entry = team_details[team_id]
+            if set(entry) != DETAIL_KEYS:
+                return None
+            details.append(DETAIL.pack(int(team_id), strings.ref(entry['record']), len(scorers), len(entry['scorers'])))
+            for scorer in entry['scorers']:
+                # ppg is stored as a double, so only floats round-trip to identical JSON
+                if set(scorer) != SCORER_KEYS or not isinstance(scorer['ppg'], float):
+                    return None
+                scorers.append(SCORER.pack(strings.ref(scorer['name']), strings.ref(scorer['img']), scorer['ppg']))
+    except (TypeError, KeyError, ValueError, struct.error, OverflowError):
+        return None
+
+    string_offsets, string_blob = strings.encode()
+    sections = [
+        string_offsets,
+        string_blob,
+        b''.join(records),
+        struct.pack(f'<{len(by_id)}I', *by_id),
+        b''.join(opponents),
+        struct.pack(f'<{len(h2h)}I', *h2h),
+        b''.join(teams),
+        b''.join(details),
+        b''.join(scorers),
+    ]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        position += -position % 8
+        offsets.append(position)
+        position += len(section)
+
+    out = bytearray(position)
+    HEADER.pack_into(out, 0, MAGIC, FORMAT, 0, _version(version),
+                     len(records), len(strings.values), len(opponents), len(teams), len(details), len(scorers),
+                     *offsets, position)
+    for offset, section in zip(offsets, sections):
+        out[offset:offset + len(section)] = section
+    return bytes(out)
+
+
+class _Column(Sequence):
+    # Read-only sequence decoding one item at a time; enough for bisect and slicing by index
+    __slots__ = ('_n', '_get')
+
+    def __init__(self, n, get):
+        self._n = n
+        self._get = get
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self._get(j) for j in range(*i.indices(self._n)))
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return self._get(i)
+
+
+class _SortedTable(Mapping):
+    """Mapping over records sorted by a key, looked up by binary search."""
+
+    def __init__(self, n, key_at, value_at, parse_key=str):
+        self._keys = _Column(n, key_at)
+        self._value_at = value_at
+        self._parse_key = parse_key
+
+    def __getitem__(self, key):
+        try:
+            key = self._parse_key(key)
+        except (TypeError, ValueError):
+            raise KeyError(key)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            raise KeyError(key)
+        return self._value_at(i)
+
+    def __iter__(self):
+        # Keys come back as strings, like the JSON objects this replaces
+        return (str(key) for key in self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class SnapshotFile:
+    """Read-only view of a snapshot file; games and details decode on access."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, fmt, _, version, _, n_strings, _, n_teams, n_details, _,
+         strings_off, blob_off, self._games_off, self._by_id_off, self._opponents_off, self._h2h_off, teams_off,
+         details_off, scorers_off, size) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or fmt != FORMAT or size != len(self._map):
+            raise ValueError(f"{path} is not a format {FORMAT} snapshot")
+        self.version = version.rstrip(b'\0').decode('ascii')
+        self._strings_off = strings_off
+        self._blob_off = blob_off
+        self._teams_off = teams_off
+        self._details_off = details_off
+        self._scorers_off = scorers_off
+
+        self.schedules = _SortedTable(
+            n_teams, lambda i: TEAM.unpack_from(self._map, teams_off + i * TEAM.size)[0],
+            self._schedule_at, parse_key=int)
+        self.team_details = _SortedTable(
+            n_details, lambda i: DETAIL.unpack_from(self._map, details_off + i * DETAIL.size)[0],
+            self._detail_at, parse_key=int)
+
+    def _string(self, ref):
+        if ref == NONE:
+            return None
+        start, end = struct.unpack_from('<2I', self._map, self._strings_off + ref * 4)
+        return self._map[self._blob_off + start:self._blob_off + end].decode('utf-8')
+
+    def _game_record(self, i):
+        return GAME.unpack_from(self._map, self._games_off + i * GAME.size)
+
+    def _game_field(self, i, field):
+        return U32.unpack_from(self._map, self._games_off + i * GAME.size + field * 4)[0]
+
+    def game_at(self, i):
+        (id_ref, date, time, opponent, location, score, wl, status, opponent_id, pts, plus_minus, tip, key, flags) = \
+            self._game_record(i)
+        s = self._string
+        return {
+            "id": s(id_ref), "date": s(date), "time": s(time), "opponent": s(opponent),
+            "opponent_id": opponent_id, "isHome": bool(flags & IS_HOME), "location": s(location),
+            "score": s(score), "wl": s(wl), "pts": pts, "plus_minus": plus_minus,
+            "tipoff": None if tip == NO_TIP else tip, "game_status": s(status), "sort_key": key,
+        }
+
+    def _schedule_at(self, i):
+        return MappedSchedule(self, *TEAM.unpack_from(self._map, self._teams_off + i * TEAM.size)[1:])
+
+    def _detail_at(self, i):
+        _, record, start, count = DETAIL.unpack_from(self._map, self._details_off + i * DETAIL.size)
+        scorers = []
+        for j in range(start, start + count):
+            name, img, ppg = SCORER.unpack_from(self._map, self._scorers_off + j * SCORER.size)
+            scorers.append({"name": self._string(name), "ppg": ppg, "img": self._string(img)})
+        return {"record": self._string(record), "scorers": scorers}
+
+
+class MappedSchedule:
+    """One team's section of a SnapshotFile, as the columns ScheduleIndex keeps."""
+
+    def __init__(self, snapshot, version, first_game, n_games, first_opponent, n_opponents, last_result_pos):
+        self._snapshot = snapshot
+        self._first_game = first_game
+        self._first_opponent = first_opponent
+        self.version = version.rstrip(b'\0').decode('ascii')
+        self.last_result_pos = last_result_pos if last_result_pos >= 0 else None
+
+        self.games = _Column(n_games, lambda i: snapshot.game_at(first_game + i))
+        self.keys = _Column(n_games, lambda i: snapshot._game_record(first_game + i)[12])
+        self.tips = _Column(n_games, self._tip_at)
+        self.positions = _SortedTable(n_games, self._id_at_rank, self._position_at_rank)
+        self.by_id = _SortedTable(n_games, self._id_at_rank, lambda r: self.games[self._position_at_rank(r)])
+        self.played_by_opponent = _SortedTable(
+            n_opponents, lambda i: self._opponent_at(i)[0], self._h2h_at, parse_key=int)
+
+    def __len__(self):
+        return len(self.games)
+
+    def _tip_at(self, i):
+        tip = self._snapshot._game_record(self._first_game + i)[11]
+        return None if tip == NO_TIP else tip
+
+    def _position_at_rank(self, rank):
+        snapshot = self._snapshot
+        return U32.unpack_from(snapshot._map, snapshot._by_id_off + (self._first_game + rank) * 4)[0]
+
+    def _id_at_rank(self, rank):
+        snapshot = self._snapshot
+        return snapshot._string(snapshot._game_field(self._first_game + self._position_at_rank(rank), 0))
+
+    def _opponent_at(self, i):
+        snapshot = self._snapshot
+        return OPPONENT.unpack_from(snapshot._map, snapshot._opponents_off + (self._first_opponent + i) * OPPONENT.size)
+
+    def _h2h_at(self, i):
+        _, start, count = self._opponent_at(i)
+        snapshot = self._snapshot
+        positions = struct.unpack_from(f'<{count}I', snapshot._map, snapshot._h2h_off + start * 4)
+        return tuple(self.games[p] for p in positions)
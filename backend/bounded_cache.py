@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost (key tuple, entry object, dict slot) counted
+# against the byte budget, so even empty negative entries are not free
+ENTRY_OVERHEAD = 200
+
+_NEGATIVE = object()
+
+
+class BoundedCache:
+    """LRU cache with per-entry TTL, bounded by entry count and total bytes.
+
+    Keys may be client-controlled (e.g. game ids from the URL), so both
+    limits are enforced on every insert. ``put_missing`` records a cheap
+    negative entry for keys known not to exist; ``get`` then reports them
+    with ``MISSING`` instead of forcing the caller to look them up again.
+    """
+
+    MISSING = _NEGATIVE
+
+    def __init__(self, max_entries, max_bytes, ttl, negative_ttl=None, sizeof=len, name='cache'):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self.sizeof = sizeof
+        self.name = name
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def _drop(self, key):
+        _, _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key, version=None):
+        """Return the value for key, MISSING for a cached negative, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            value, entry_version, expires_at, _ = entry
+            if time.monotonic() >= expires_at or entry_version != version:
+                self._drop(key)
+                self.counters['expirations'] += 1
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['negative_hits' if value is _NEGATIVE else 'hits'] += 1
+            return value
+
+    def put(self, key, value, version=None):
+        self._put(key, value, version, self.ttl, self.sizeof(value))
+
+    def put_missing(self, key, version=None):
+        self._put(key, _NEGATIVE, version, self.negative_ttl, 0)
+
+    def _put(self, key, value, version, ttl, size):
+        size += ENTRY_OVERHEAD + len(repr(key))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, version, time.monotonic() + ttl, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def state(self):
+        with self._lock:
+            negative = sum(1 for value, _, _, _ in self._entries.values() if value is _NEGATIVE)
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'negative_entries': negative,
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'negative_ttl_seconds': self.negative_ttl,
+                'counters': dict(self.counters),
+            }
@@ -0,0 +1,129 @@
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this go out uncompressed; the framing overhead isn't worth it
+MIN_COMPRESS_SIZE = 256
+
+# Preferred order when the client accepts several encodings equally
+ENCODING_PREFERENCE = ('br', 'gzip')
+
+# Response artifacts are compressed hard once, by generate_data.py, and written
+# next to the identity body with these suffixes. Bodies computed by the API
+# are compressed on the request path, so they get cheap levels: brotli 11
+# costs ~3 ms per small body, quality 4 about 0.05 ms.
+ARTIFACT_LEVELS = {'gzip': 9, 'br': 11}
+REQUEST_LEVELS = {'gzip': 1, 'br': 4}
+ARTIFACT_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+def compress_variants(body, levels=REQUEST_LEVELS):
+    """{encoding: bytes} for every encoding that actually shrinks the body."""
+    variants = {}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+    gz = gzip.compress(body, compresslevel=levels['gzip'], mtime=0)
+    if len(gz) < len(body):
+        variants['gzip'] = gz
+    if brotli is not None:
+        br = brotli.compress(body, quality=levels['br'])
+        if len(br) < len(body):
+            variants['br'] = br
+    return variants
+
+
+class EncodedBody:
+    """A response body plus its compressed variants.
+
+    Artifacts arrive with variants precompressed by generate_data.py; other
+    bodies are compressed once at REQUEST_LEVELS when they are built.
+    """
+
+    __slots__ = ('variants', 'mimetype', 'headers')
+
+    def __init__(self, body, mimetype='application/json', headers=None, variants=None):
+        self.variants = {'identity': body}
+        self.variants.update(compress_variants(body) if variants is None else variants)
+        self.mimetype = mimetype
+        self.headers = headers or {}
+
+    @property
+    def identity(self):
+        return self.variants['identity']
+
+    def negotiate(self, accept_encodings):
+        # Highest-q encoding we hold; ties go to ENCODING_PREFERENCE order
+        best, best_q = 'identity', 0
+        for encoding in ENCODING_PREFERENCE:
+            if encoding not in self.variants:
+                continue
+            q = accept_encodings[encoding]
+            if q > best_q:
+                best, best_q = encoding, q
+        return best, self.variants[best]
+
+
+class CompressionStats:
+    """Totals for a batch of compressed bodies (one generate_data.py run)."""
+
+    def __init__(self):
+        self.bodies = 0
+        self.bytes = {'identity': 0, 'gzip': 0, 'br': 0}
+        self.seconds = 0.0
+
+    def add(self, body, variants, seconds):
+        self.bodies += 1
+        self.seconds += seconds
+        self.bytes['identity'] += len(body)
+        for encoding in ('gzip', 'br'):
+            # Bodies left uncompressed count at full size
+            self.bytes[encoding] += len(variants.get(encoding, body))
+
+    def saved(self, encoding):
+        return self.bytes['identity'] - self.bytes[encoding]
+
+    def report(self):
+        # For the run report
+        return {"bodies": self.bodies, "bytes": dict(self.bytes),
+                "saved": {encoding: self.saved(encoding) for encoding in ('gzip', 'br')},
+                "compress_seconds": round(self.seconds, 4)}
+
+    def summary(self):
+        identity = self.bytes['identity'] or 1
+        parts = [f"{self.bodies} bodies, {self.bytes['identity']} B identity"]
+        for encoding in ('gzip', 'br'):
+            if encoding == 'br' and brotli is None:
+                continue
+            parts.append(f"{encoding} {self.bytes[encoding]} B (-{100 * self.saved(encoding) / identity:.0f}%)")
+        return ", ".join(parts) + f" in {self.seconds * 1000:.1f} ms"
+
+
+def read_encoded(path, written_before=None, **kwargs):
+    """An artifact body plus whichever precompressed siblings sit next to it.
+
+    With written_before (epoch seconds), returns None if any of the files
+    was modified at or after it: a newer generate_data.py run is replacing
+    them, and the caller's snapshot no longer matches what is on disk.
+    """
+    files = [(None, path)] + [(encoding, path + suffix) for encoding, suffix in ARTIFACT_SUFFIXES.items()]
+    body = None
+    variants = {}
+    for encoding, file_path in files:
+        try:
+            with open(file_path, 'rb') as f:
+                if written_before is not None and os.fstat(f.fileno()).st_mtime >= written_before:
+                    return None
+                data = f.read()
+        except FileNotFoundError:
+            if encoding is None:
+                raise
+            continue
+        if encoding is None:
+            body = data
+        else:
+            variants[encoding] = data
+    return EncodedBody(body, variants=variants, **kwargs)
@@ -0,0 +1,634 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+from archive import ARCHIVE_EXPORT_FILE, ARCHIVE_FILE, load_archive
+from binary_snapshot import SnapshotFile
+from compression import read_encoded
+
+# Serve another data directory (e.g. a synthetic benchmark dataset) without code changes
+DATA_DIR_ENV = 'WARRIORS_DATA_DIR'
+DATA_DIR = os.environ.get(DATA_DIR_ENV) or os.path.join(os.path.dirname(__file__), 'data')
+SCHEDULE_FILE = 'schedule.json'
+TEAM_DETAILS_FILE = 'team_details.json'
+
+# Pre-rendered API responses written by generate_data.py (see responses.py)
+ARTIFACT_DIR = 'api'
+MANIFEST_FILE = os.path.join(ARTIFACT_DIR, 'manifest.json')
+# Bumped when the manifest layout changes; other formats are ignored and regenerated.
+# 2: upcoming variants carry the X-Next-Cursor value
+# 3: bodies come with precompressed .gz/.br siblings
+ARTIFACT_FORMAT = 3
+
+# Binary copy of every team's schedule + team_details.json, mmap'd when its version matches
+SNAPSHOT_FILE = 'snapshot.bin'
+
+# Per-team schedules written by generate_data.py; the index lists them all
+TEAMS_INDEX_FILE = os.path.join('teams', 'index.json')
+
+# schedule.json (and the legacy /api/* routes) cover this team
+WARRIORS_ID = 1610612744
+DEFAULT_TEAM_NAME = "Golden State Warriors"
+DEFAULT_TRICODE = "GSW"
+
+# How often (seconds) a request may stat() the data files to look for changes
+CHECK_INTERVAL = 2.0
+
+# schedule.json and teams/*.json: v1 is a bare list of games; v2 wraps them
+# as {"schema_version": 2, "games": [...]} and every game also carries
+# tipoff (UTC epoch, null when TBD), game_status and sort_key (tipoff, or the
+# end of its day when the time is unknown). v1 games are upgraded on load.
+SCHEDULE_SCHEMA = 2
+GAME_SCHEDULED = 'scheduled'
+GAME_LIVE = 'live'
+GAME_FINAL = 'final'
+
+# Dates and display times in the data files are Los Angeles local time
+try:
+    from zoneinfo import ZoneInfo
+    PACIFIC = ZoneInfo("America/Los_Angeles")
+except Exception:
+    PACIFIC = timezone(timedelta(hours=-8))
+
+# Offsets named by v1 display times ("7:00 PM PST", "7:30 PM PDT")
+TIME_SUFFIXES = {'PST': timezone(timedelta(hours=-8)), 'PDT': timezone(timedelta(hours=-7))}
+
+# A game counts as finished this long after tip-off even without a result
+GAME_FINISHED_AFTER = 3 * 3600
+
+
+def file_signature(path):
+    # Cheap change detection: inode, size and mtime are enough to spot a rewrite
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def parse_json(raw, default, name):
+    if not raw:
+        return default
+    try:
+        return json.loads(raw)
+    except Exception as e:
+        print(f"Error loading {name}: {e}")
+        return default
+
+
+def read_raw(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError as e:
+        print(f"Error loading {os.path.basename(path)}: {e}")
+        return b''
+
+
+def load_mapped(data_dir, version):
+    # SnapshotFile for these exact data files, or None to parse the JSON instead
+    path = os.path.join(data_dir, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        mapped = SnapshotFile(path)
+    except Exception as e:
+        print(f"Error loading {SNAPSHOT_FILE}: {e}")
+        return None
+    if mapped.version != version:
+        print(f"Ignoring {SNAPSHOT_FILE} for version {mapped.version}")
+        return None
+    return mapped
+
+
+def mapped_index(mapped, team_id, version):
+    # MappedScheduleIndex over the team's section of snapshot.bin, or None if
+    # it has none for this version of the team's schedule file
+    schedule = mapped.schedules.get(team_id) if mapped is not None else None
+    if schedule is None or schedule.version != version:
+        return None
+    return MappedScheduleIndex(schedule)
+
+
+def snapshot_version(schedule_raw, details_raw, archive_revision=None):
+    # Content hash of the two data files (plus the archive revision, when there
+    # is one); generate_data.py stamps artifacts with it
+    digest = hashlib.sha1()
+    digest.update(schedule_raw)
+    digest.update(b'\0')
+    digest.update(details_raw)
+    if archive_revision is not None:
+        digest.update(f"\0{archive_revision}".encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def archive_revision(archive):
+    return archive.revision if archive is not None else None
+
+
+def head_to_head(index, archive, team_id, opponent_id):
+    """Played games against opponent_id, most recent first.
+
+    This season's come from the schedule (live results included); earlier
+    seasons from the archive, with one indexed query.
+    """
+    games = index.head_to_head(opponent_id)
+    if archive is not None and len(index):
+        games = tuple(games) + archive.head_to_head(team_id, opponent_id, before=index.games[0]['date'])
+    return games
+
+
+@lru_cache(maxsize=4096)
+def day_start(date_str):
+    # Epoch of Pacific midnight for a YYYY-MM-DD string (DST-aware)
+    day = datetime.strptime(date_str, '%Y-%m-%d')
+    return int(day.replace(tzinfo=PACIFIC).timestamp())
+
+
+def day_end(date_str):
+    return day_start((date.fromisoformat(date_str) + timedelta(days=1)).isoformat())
+
+
+_today = (0, 0)
+
+
+def day_bounds(now):
+    """(start, end) epochs of the Pacific day containing ``now``."""
+    global _today
+    start, end = _today
+    if not start <= now < end:
+        day = datetime.fromtimestamp(now, PACIFIC).date().isoformat()
+        start, end = day_start(day), day_end(day)
+        _today = (start, end)
+    return start, end
+
+
+def parse_tipoff(game):
+    # v1 rows only have the display time; returns a UTC epoch, or None when
+    # the time is unknown (TBD)
+    time_str = (game.get('time') or '').strip()
+    tz = PACIFIC
+    head, _, suffix = time_str.rpartition(' ')
+    if suffix in TIME_SUFFIXES:
+        time_str, tz = head, TIME_SUFFIXES[suffix]
+    if not time_str:
+        return None
+    try:
+        game_date = datetime.strptime(game['date'], '%Y-%m-%d').date()
+        game_time = datetime.strptime(time_str, '%I:%M %p').time()
+    except Exception:
+        return None
+    return int(datetime.combine(game_date, game_time, tzinfo=tz).timestamp())
+
+
+def game_sort_key(date_str, tipoff):
+    # Unknown tip-off times sort to the end of their day
+    return tipoff if tipoff is not None else day_end(date_str) - 1
+
+
+def upgrade_game(game):
+    """A v1 game with the v2 fields filled in; fields already present win."""
+    tipoff = parse_tipoff(game)
+    return {
+        "tipoff": tipoff,
+        "game_status": GAME_FINAL if game.get('wl') else GAME_SCHEDULED,
+        "sort_key": game_sort_key(game['date'], tipoff),
+        **game,
+    }
+
+
+def schedule_games(data):
+    """The games of a parsed schedule file of either schema version."""
+    if isinstance(data, dict):
+        if data.get('schema_version') != SCHEDULE_SCHEMA:
+            print(f"Unexpected schedule schema {data.get('schema_version')}; reading its games anyway")
+        return data.get('games') or []
+    return data or []
+
+
+def schedule_document(games):
+    return {"schema_version": SCHEDULE_SCHEMA, "games": games}
+
+
+class ScheduleIndex:
+    """Games ordered by tip-off, with parallel key arrays for binary search.
+
+    ``keys`` holds each game's sort key (an epoch), so locating "now", a day
+    or a date range is an integer bisect.
+    """
+
+    def __init__(self, schedule):
+        keyed = []
+        for game in schedule:
+            if not game.get('date'):
+                continue
+            if 'sort_key' not in game:
+                game = upgrade_game(game)
+            keyed.append((game['sort_key'], game))
+        keyed.sort(key=lambda k: k[0])
+
+        self.games = tuple(k[1] for k in keyed)
+        self.keys = tuple(k[0] for k in keyed)
+        self.tips = tuple(g['tipoff'] for g in self.games)
+        self.positions = {str(g['id']): i for i, g in enumerate(self.games)}
+        self.by_id = {str(g['id']): g for g in self.games}
+
+        # Played games per opponent, most recent first
+        played = {}
+        for game in reversed(self.games):
+            if game.get('wl'):
+                played.setdefault(str(game.get('opponent_id')), []).append(game)
+        self.played_by_opponent = {opp: tuple(games) for opp, games in played.items()}
+
+        self.last_result_pos = None
+        for i in range(len(self.games) - 1, -1, -1):
+            if self.games[i].get('wl'):
+                self.last_result_pos = i
+                break
+
+    def __len__(self):
+        return len(self.games)
+
+    def game(self, game_id):
+        return self.by_id.get(str(game_id))
+
+    def head_to_head(self, opponent_id):
+        return self.played_by_opponent.get(str(opponent_id), ())
+
+    def last_game(self, now):
+        """Most recent finished game as of ``now`` (epoch)."""
+        if self.last_result_pos is not None:
+            return self.games[self.last_result_pos]
+
+        # No recorded results: only games keyed before now can have finished,
+        # and every one keyed more than GAME_FINISHED_AFTER ago has, so this
+        # walks back over a few hours of games at most
+        for i in range(bisect_right(self.keys, now) - 1, -1, -1):
+            if self.finished_at(i) <= now:
+                return self.games[i]
+        return None
+
+    def finished_at(self, pos):
+        # When the game at ``pos`` starts counting as played without a result
+        qualifies_at = day_end(self.games[pos]['date'])
+        if self.tips[pos] is not None:
+            qualifies_at = min(qualifies_at, self.tips[pos] + GAME_FINISHED_AFTER)
+        return qualifies_at
+
+    def last_game_since(self, game):
+        """Epoch from which last_game() has been returning ``game``."""
+        if self.last_result_pos is not None:
+            return 0
+        return self.finished_at(self.positions[str(game['id'])])
+
+    def last_game_timeline(self):
+        """[(from_epoch, game)] such that last_game() at time t is the last entry with from <= t."""
+        if self.last_result_pos is not None:
+            return [(0, self.games[self.last_result_pos])]
+
+        # A game qualifies once its day is over, or 3 hours after a known tip-off;
+        # last_game() returns the latest-ordered game that qualifies
+        events = sorted((self.finished_at(i), i) for i in range(len(self.games)))
+
+        timeline = []
+        best = -1
+        for qualifies_at, i in events:
+            if i <= best:
+                continue
+            best = i
+            if timeline and timeline[-1][0] == qualifies_at:
+                timeline[-1] = (qualifies_at, i)
+            else:
+                timeline.append((qualifies_at, i))
+        return [(at, self.games[i]) for at, i in timeline]
+
+    def window(self, start=None, end=None, after_id=None, limit=10, unplayed_only=False):
+        """Slice of games keyed in [start, end) (epochs), in tip-off order.
+
+        ``after_id`` resumes after a previously returned game. Returns the page
+        and the id to pass as the next cursor (None on the last page).
+        """
+        if after_id is not None:
+            first = self.positions[after_id] + 1
+        elif start is not None:
+            first = bisect_left(self.keys, start)
+        else:
+            first = 0
+        stop = bisect_left(self.keys, end) if end is not None else len(self.games)
+
+        page = []
+        pos = first
+        while pos < stop and len(page) < limit:
+            game = self.games[pos]
+            pos += 1
+            if unplayed_only and game.get('wl'):
+                continue
+            page.append(game)
+
+        next_cursor = str(page[-1]['id']) if page and pos < stop else None
+        return page, next_cursor
+
+
+class MappedScheduleIndex(ScheduleIndex):
+    """ScheduleIndex over one team's section of a memory-mapped snapshot.bin.
+
+    Same attributes and lookups, but every column and table decodes records
+    from the shared mapping on access instead of holding parsed objects.
+    """
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+        self.games = mapped.games
+        self.keys = mapped.keys
+        self.tips = mapped.tips
+        self.positions = mapped.positions
+        self.by_id = mapped.by_id
+        self.played_by_opponent = mapped.played_by_opponent
+        self.last_result_pos = mapped.last_result_pos
+
+
+class ResponseArtifacts:
+    """Ready-to-serve response bodies emitted by generate_data.py.
+
+    Time-dependent endpoints are stored as variants plus a small selector:
+    last-game variants carry the epoch they become current, upcoming variants
+    the last date they apply to. Only the manifest is loaded; bodies (with
+    the .gz/.br copies generate_data.py compressed next to them) are read when
+    a response is built. The OS page cache is shared by every worker, and the
+    copies a worker keeps live in its bounded response caches.
+    """
+
+    def __init__(self, manifest, base_dir, loaded_at):
+        self.version = manifest['version']
+        self.generated_at = manifest.get('generated_at')
+        self.base_dir = base_dir
+        # Files rewritten after this belong to a newer run than the manifest
+        self.loaded_at = loaded_at
+
+        last_game = manifest.get('last_game', [])
+        self.last_game_from = [v['from'] for v in last_game]
+        self.last_game_files = [v['file'] for v in last_game]
+
+        upcoming = manifest.get('upcoming', [])
+        self.upcoming_until = [day_end(v['through']) for v in upcoming]
+        self.upcoming_files = [(v['file'], v.get('next_cursor')) for v in upcoming]
+
+        self.game_files = manifest.get('games', {})
+
+    def __len__(self):
+        return len(self.last_game_files) + len(self.upcoming_files) + len(self.game_files)
+
+    def read(self, rel_path, headers=None):
+        # None when the file is gone or newer than the manifest; callers
+        # then compute the body from the snapshot instead
+        try:
+            return read_encoded(os.path.join(self.base_dir, rel_path), written_before=self.loaded_at,
+                                headers=headers)
+        except OSError:
+            return None
+
+    def last_game(self, now):
+        i = bisect_right(self.last_game_from, now) - 1
+        return self.read(self.last_game_files[i]) if i >= 0 else None
+
+    def upcoming(self, now):
+        # The variant for the first date that hasn't ended yet
+        i = bisect_right(self.upcoming_until, now)
+        if i >= len(self.upcoming_files):
+            return None
+        rel_path, next_cursor = self.upcoming_files[i]
+        return self.read(rel_path, {'X-Next-Cursor': next_cursor} if next_cursor else None)
+
+    def game(self, game_id):
+        rel_path = self.game_files.get(str(game_id))
+        return self.read(rel_path) if rel_path is not None else None
+
+
+def load_artifacts(data_dir, version):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        loaded_at = time.time()
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != version or manifest.get('format') != ARTIFACT_FORMAT:
+            # Stale artifacts from an older run; serve computed responses instead
+            print(f"Ignoring response artifacts for version {manifest.get('version')} "
+                  f"(format {manifest.get('format')})")
+            return None
+        return ResponseArtifacts(manifest, os.path.join(data_dir, ARTIFACT_DIR), loaded_at)
+    except Exception as e:
+        print(f"Error loading response artifacts: {e}")
+        return None
+
+
+class TeamData:
+    """Everything the request handlers need for one team's routes."""
+
+    def __init__(self, team_id, name, tricode, schedule, team_details, version, modified_at,
+                 artifacts=None, archive=None):
+        self.team_id = team_id
+        self.name = name
+        self.tricode = tricode
+        if isinstance(schedule, ScheduleIndex):
+            self.index = schedule
+            self.schedule = schedule.games
+        else:
+            self.schedule = tuple(schedule_games(schedule))
+            self.index = ScheduleIndex(self.schedule)
+        self.team_details = team_details
+        self.artifacts = artifacts
+        self.archive = archive
+        self.version = version
+        self.modified_at = modified_at
+
+    def head_to_head(self, opponent_id):
+        return head_to_head(self.index, self.archive, self.team_id, opponent_id)
+
+
+class Snapshot(TeamData):
+    """One parsed, read-only view of the data files.
+
+    The snapshot itself is the Warriors' view (schedule.json); ``teams`` holds
+    a TeamData per team, sharing team_details. Request handlers must treat
+    everything here as immutable; a reload builds a new Snapshot and swaps it
+    in rather than touching the old one.
+    """
+
+    def __init__(self, schedule, team_details, version, signature, modified_at,
+                 artifacts=None, teams=None, team_meta=None, archive=None):
+        meta = (team_meta or {}).get(WARRIORS_ID, {})
+        super().__init__(WARRIORS_ID, meta.get('name') or DEFAULT_TEAM_NAME, meta.get('tricode') or DEFAULT_TRICODE,
+                         schedule, team_details, version, modified_at, artifacts, archive)
+        self.signature = signature
+        self.loaded_at = time.time()
+        self.teams = dict(teams or {})
+        self.teams[WARRIORS_ID] = self
+        self.tricodes = {view.tricode.upper(): view for view in self.teams.values() if view.tricode}
+
+    def team(self, key):
+        """Look a team up by numeric id or tricode (case-insensitive)."""
+        key = str(key).strip()
+        if key.isdigit():
+            return self.teams.get(int(key))
+        return self.tricodes.get(key.upper())
+
+
+def load_team_views(data_dir, team_details, details_raw, details_mtime, archive=None, mapped=None):
+    """TeamData for every team listed in teams/index.json except the Warriors.
+
+    A team's file is still read to get its version, but only parsed when
+    snapshot.bin (``mapped``) has no section for that version.
+    """
+    path = os.path.join(data_dir, TEAMS_INDEX_FILE)
+    if not os.path.exists(path):
+        return {}, {}
+    teams = {}
+    meta = {}
+    try:
+        with open(path, 'r') as f:
+            index = json.load(f)
+        for team_id, entry in index.get('teams', {}).items():
+            team_id = int(team_id)
+            meta[team_id] = entry
+            if team_id == WARRIORS_ID:
+                continue
+            file_path = os.path.join(data_dir, entry['file'])
+            raw = read_raw(file_path)
+            version = snapshot_version(raw, details_raw, archive_revision(archive))
+            schedule = mapped_index(mapped, team_id, version)
+            if schedule is None:
+                schedule = parse_json(raw, [], entry['file'])
+            teams[team_id] = TeamData(
+                team_id, entry.get('name'), entry.get('tricode'), schedule, team_details, version,
+                max(os.path.getmtime(file_path), details_mtime), archive=archive)
+    except Exception as e:
+        print(f"Error loading team schedules: {e}")
+    return teams, meta
+
+
+class DataStore:
+    def __init__(self, data_dir=DATA_DIR, check_interval=CHECK_INTERVAL):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._paths = (
+            os.path.join(data_dir, SCHEDULE_FILE),
+            os.path.join(data_dir, TEAM_DETAILS_FILE),
+            os.path.join(data_dir, MANIFEST_FILE),
+            os.path.join(data_dir, TEAMS_INDEX_FILE),
+            os.path.join(data_dir, SNAPSHOT_FILE),
+            os.path.join(data_dir, ARCHIVE_FILE),
+            os.path.join(data_dir, ARCHIVE_EXPORT_FILE),
+        )
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._base = None
+        self._live = {}
+        self._listeners = []
+        self._next_check = 0.0
+
+    def _signature(self):
+        return tuple(file_signature(p) for p in self._paths)
+
+    def _load(self, signature):
+        schedule_path, details_path = self._paths[:2]
+        schedule_raw = read_raw(schedule_path)
+        details_raw = read_raw(details_path)
+        archive = load_archive(self.data_dir)
+        version = snapshot_version(schedule_raw, details_raw, archive_revision(archive))
+
+        mapped = load_mapped(self.data_dir, version)
+        schedule = mapped_index(mapped, WARRIORS_ID, version)
+        if schedule is not None:
+            team_details = mapped.team_details
+        else:
+            schedule = parse_json(schedule_raw, [], SCHEDULE_FILE)
+            team_details = parse_json(details_raw, {}, TEAM_DETAILS_FILE)
+
+        artifacts = load_artifacts(self.data_dir, version)
+        if artifacts:
+            print(f"Loaded response artifact manifest: {len(artifacts)} bodies, read on demand")
+        details_mtime = signature[1][2] / 1e9 if signature[1] else 0
+        teams, team_meta = load_team_views(self.data_dir, team_details, details_raw, details_mtime, archive, mapped)
+        modified_at = max((s[2] / 1e9 for s in signature[:3] if s), default=time.time())
+        return Snapshot(schedule, team_details, version, signature, modified_at, artifacts,
+                        teams, team_meta, archive)
+
+    def _with_live(self, base):
+        # Overlay live score patches on games the data files have no result for
+        # yet; once a regenerated schedule.json has the result, the patch is dropped
+        live = {}
+        for game_id, patch in self._live.items():
+            game = base.index.game(game_id)
+            if game is not None and not game.get('wl'):
+                live[game_id] = patch
+        self._live = live
+        if not live:
+            return base
+        schedule = [dict(g, **live[str(g['id'])]) if str(g['id']) in live else g for g in base.schedule]
+        digest = hashlib.sha1(json.dumps(live, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+        teams = {team_id: view for team_id, view in base.teams.items() if team_id != WARRIORS_ID}
+        meta = {WARRIORS_ID: {'name': base.name, 'tricode': base.tricode}}
+        # Pre-rendered artifacts describe the unpatched files, so the patched
+        # view serves computed responses
+        return Snapshot(schedule, base.team_details, f"{base.version}+{digest}", base.signature, time.time(),
+                        None, teams, meta, base.archive)
+
+    def on_swap(self, listener):
+        """Call listener(old, new) after every snapshot swap (old is None on first load)."""
+        self._listeners.append(listener)
+
+    def _notify(self, old, new):
+        if old is new:
+            return
+        for listener in self._listeners:
+            try:
+                listener(old, new)
+            except Exception as e:
+                print(f"Snapshot listener failed: {e}")
+
+    def apply_live(self, patches):
+        """Merge {game_id: fields} into the Warriors schedule and swap in a new snapshot."""
+        with self._lock:
+            if self._base is None:
+                self._base = self._load(self._signature())
+            for game_id, patch in patches.items():
+                self._live[str(game_id)] = dict(patch)
+            current = self._snapshot
+            self._snapshot = self._with_live(self._base)
+            snapshot = self._snapshot
+        self._notify(current, snapshot)
+        return snapshot
+
+    def reload(self, force=False):
+        with self._lock:
+            signature = self._signature()
+            current = self._snapshot
+            if force or current is None or signature != current.signature:
+                self._base = self._load(signature)
+                self._snapshot = self._with_live(self._base)
+                if current is not None:
+                    print(f"Data snapshot reloaded: {current.version} -> {self._snapshot.version}")
+            self._next_check = time.monotonic() + self.check_interval
+            snapshot = self._snapshot
+        self._notify(current, snapshot)
+        return snapshot
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() >= self._next_check:
+            return self.reload()
+        return snapshot
+
+    def current(self):
+        # Last loaded snapshot, without checking the files for changes
+        return self._snapshot or self.reload()
+
+
+store = DataStore()
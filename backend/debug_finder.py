@@ -1,5 +1,8 @@
 from nba_api.stats.endpoints import leaguegamefinder
 import pandas as pd
+from upstream import configure_stats_http
+
+configure_stats_http()
 
 pd.set_option('display.max_columns', None)
 pd.set_option('display.width', 1000)
@@ -2,6 +2,9 @@ from nba_api.stats.endpoints import scoreboardv2
 from nba_api.stats.static import teams
 from datetime import datetime, timedelta
 import pandas as pd
+from upstream import configure_stats_http
+
+configure_stats_http()
 
 WARRIORS_ID = 1610612744
 
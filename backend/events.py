@@ -0,0 +1,119 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+
+# Events kept for Last-Event-ID resume; older cursors get a reset instead
+EVENT_BACKLOG = 256
+
+# Comment line sent on idle streams so proxies don't time them out
+HEARTBEAT_SECONDS = 15
+HEARTBEAT = b': ping\n\n'
+
+# Each connection is told to reconnect after a random delay in this range, so
+# a deploy that drops every stream doesn't bring every client back at once
+RETRY_MS = (2000, 10000)
+
+# Schedule fields whose changes are pushed to clients
+RESULT_FIELDS = ('wl', 'pts', 'plus_minus', 'score', 'status', 'game_status')
+TIME_FIELDS = ('date', 'time', 'tipoff')
+
+
+def format_event(event_id, kind, data):
+    payload = json.dumps(data, separators=(',', ':'), sort_keys=True)
+    return f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n".encode('utf-8')
+
+
+def diff_snapshots(old, new):
+    """(type, data) change events for the Warriors schedule between two snapshots."""
+    if old is None:
+        return []
+    events = []
+    for game in new.index.games:
+        before = old.index.game(game['id'])
+        if before is None:
+            continue
+        if any(before.get(k) != game.get(k) for k in TIME_FIELDS):
+            events.append(('time', {"game_id": game['id'], "date": game.get('date'), "time": game.get('time'),
+                                    "tipoff": game.get('tipoff')}))
+        if any(before.get(k) != game.get(k) for k in RESULT_FIELDS):
+            data = {"game_id": game['id']}
+            data.update({k: game[k] for k in RESULT_FIELDS if k in game})
+            events.append(('result' if game.get('wl') else 'score', data))
+    events.append(('version', {"version": new.version, "previous": old.version}))
+    return events
+
+
+class EventLog:
+    """Bounded log of change events shared by every stream connection.
+
+    Events are encoded once when published; connections only hold a cursor
+    (the last event id they sent). Publishing wakes threads blocked in
+    wait() and calls any registered wakers, which is how asyncio loops
+    in other threads get notified.
+    """
+
+    def __init__(self, maxlen=EVENT_BACKLOG):
+        self._events = deque(maxlen=maxlen)
+        # Ids start from the boot time so they keep increasing across restarts
+        self.last_id = int(time.time() * 1000)
+        self.version = None
+        self._cond = threading.Condition()
+        self._wakers = []
+
+    def add_waker(self, waker):
+        self._wakers.append(waker)
+
+    def publish(self, kind, data):
+        with self._cond:
+            self.last_id += 1
+            self._events.append((self.last_id, format_event(self.last_id, kind, data)))
+            self._cond.notify_all()
+        for waker in self._wakers:
+            waker()
+
+    def publish_changes(self, old, new):
+        # DataStore.on_swap listener
+        events = diff_snapshots(old, new)
+        self.version = new.version
+        for kind, data in events:
+            self.publish(kind, data)
+
+    def _reset(self):
+        return format_event(self.last_id, 'reset', {"version": self.version})
+
+    def read(self, cursor):
+        """Returns (bytes to send, new cursor) for everything after cursor.
+
+        A cursor outside the backlog (too old, or from another process) gets a
+        single reset event carrying the current data version instead.
+        """
+        with self._cond:
+            if cursor == self.last_id:
+                return b'', cursor
+            first = self._events[0][0] if self._events else self.last_id + 1
+            if cursor is None or cursor > self.last_id or cursor < first - 1:
+                return self._reset(), self.last_id
+            return b''.join(body for event_id, body in self._events if event_id > cursor), self.last_id
+
+    def open(self, last_event_id=None):
+        """Preamble for a new connection: retry hint plus missed events or a reset."""
+        try:
+            cursor = int(last_event_id) if last_event_id else None
+        except ValueError:
+            cursor = None
+        body, cursor = self.read(cursor)
+        return f"retry: {random.randint(*RETRY_MS)}\n\n".encode('utf-8') + body, cursor
+
+    def wait(self, cursor, timeout):
+        # True once there is something after cursor
+        with self._cond:
+            return self._cond.wait_for(lambda: self.last_id != cursor, timeout)
+
+    def state(self):
+        with self._cond:
+            return {"last_id": self.last_id, "backlog": len(self._events), "version": self.version}
+
+
+event_log = EventLog()
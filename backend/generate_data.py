@@ -1,18 +1,60 @@
+import argparse
+import hashlib
+import io
 import json
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 
 import pandas as pd
-import requests
-from nba_api.stats.endpoints import leaguegamefinder, leaguedashplayerstats, teaminfocommon
+try:
+    import ijson
+except ImportError:
+    ijson = None
+from nba_api.stats.endpoints import leaguegamefinder, leaguedashplayerstats, leaguestandingsv3, teaminfocommon
 from nba_api.stats.static import teams
 
+from archive import ARCHIVE_EXPORT_FILE, ARCHIVE_FILE, Archive, export_revision, load_archive
+from binary_snapshot import build_snapshot
+from compression import ARTIFACT_LEVELS, ARTIFACT_SUFFIXES, CompressionStats, compress_variants
+from data_store import (ARTIFACT_DIR, ARTIFACT_FORMAT, GAME_FINAL, GAME_LIVE, GAME_SCHEDULED, MANIFEST_FILE, SNAPSHOT_FILE,
+                        ScheduleIndex, archive_revision, game_sort_key, schedule_document, schedule_games,
+                        snapshot_version, upgrade_game)
+from responses import build_artifacts
+from run_report import PROFILE_FILE, run_report
+from http_cache import MODES as HTTP_CACHE_MODES, current_cache
+from upstream import TokenBucket, call_with_backoff, configure_stats_http, http_session, response_bytes
+
 # Configuration
 WARRIORS_ID = 1610612744
 DEFAULT_SEASON = '2025-26'
 DATA_DIR = 'backend/data'
 SCHEDULE_URL = 'https://cdn.nba.com/static/json/staticData/scheduleLeagueV2.json'
+# Per-team schedules for every other team live under data/teams/
+TEAMS_DIR = 'teams'
+TEAMS_INDEX_FILE = 'index.json'
+HOME_ARENAS = {WARRIORS_ID: "Chase Center"}
+# ijson prefix of each game object in scheduleLeagueV2.json
+LEAGUE_GAME_PREFIX = 'leagueSchedule.gameDates.item.games.item'
+STREAM_HEAD_BYTES = 4096
+# ETag/Last-Modified of the last CDN schedule we processed (kept with the data so CI runs see it)
+CDN_STATE_FILE = 'cdn_state.json'
+# scheduleLeagueV2 gameStatus -> schema v2 game_status
+FEED_STATUSES = {2: GAME_LIVE, 3: GAME_FINAL}
+
+# stats.nba.com throttling: requests/second shared by all workers
+STATS_RATE = 2.0
+STATS_WORKERS = 6
+STATS_TIMEOUT = 15
+
+# Start the nba_api schedule fetch alongside the CDN if it hasn't finished by then
+HEDGE_AFTER = 5.0
+
+# What a LeagueGameFinder row can tell us about a game in the existing schedule
+RESULT_FIELDS = ('score', 'wl', 'pts', 'plus_minus', 'game_status')
 
 try:
     from zoneinfo import ZoneInfo
@@ -27,7 +69,7 @@ def load_existing_schedule():
     try:
         if os.path.exists(path):
             with open(path, 'r') as f:
-                return json.load(f)
+                return [upgrade_game(g) for g in schedule_games(json.load(f))]
     except Exception as e:
         print(f"Error loading existing schedule: {e}")
     return []
@@ -96,66 +138,207 @@ def parse_result(home, away, is_home, game_status):
     score = f"{wl} {pts}-{opp_pts}"
     return wl, score, pts, pts - opp_pts
 
-def get_schedule_from_cdn():
+class CancelToken:
+    """Lets get_schedule() abort the source that lost the hedged fetch."""
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_cancel(self, callback):
+        # Runs right away if the token was already cancelled
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+def get_schedule_from_cdn(validators=None, stream=True, cancel=None):
+    """Returns (schedules, teams, season_year, validators).
+
+    schedules maps every team id to its games and teams holds each team's
+    display name and tricode. schedules is None if the CDN answered 304.
+    """
     print("Fetching Schedule from CDN...")
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; WarriorsSchedule/1.0)",
         "Accept": "application/json",
     }
-    response = requests.get(SCHEDULE_URL, headers=headers, timeout=20)
-    response.raise_for_status()
-    payload = response.json()
+    validators = validators or {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    with run_report.call('cdn_schedule') as call:
+        response = http_session().get(SCHEDULE_URL, headers=headers, timeout=20, stream=stream)
+        if cancel is not None:
+            # Closing the response makes the download (and this call) fail fast
+            cancel.on_cancel(response.close)
+        call["status"] = response.status_code
+        call["headers_seconds"] = round(response.elapsed.total_seconds(), 4)
+        if response.status_code == 304:
+            print("CDN schedule not modified.")
+            call["bytes"] = 0
+            return None, {}, validators.get('season_year'), validators
+        response.raise_for_status()
+        new_validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        if stream and ijson is not None:
+            # Let urllib3 undo any gzip transfer encoding before the parser sees it.
+            # Download and parsing overlap here, so only the total is known.
+            call["parser"] = 'stream'
+            response.raw.decode_content = True
+            schedules, teams, season_year = stream_league_schedule(response.raw)
+            call["bytes"] = response.raw.tell()
+        else:
+            call["parser"] = 'tree'
+            start = time.perf_counter()
+            body = response.content
+            call["download_seconds"] = round(time.perf_counter() - start, 4)
+            call["bytes"] = len(body)
+            start = time.perf_counter()
+            schedules, teams, season_year = parse_league_schedule(json.loads(body))
+            call["parse_seconds"] = round(time.perf_counter() - start, 4)
+        call["games"] = sum(len(games) for games in schedules.values())
+
+    new_validators['season_year'] = season_year
+    return schedules, teams, season_year, new_validators
+
+def team_game_records(game):
+    """Normalize one league feed game into a schedule.json row for each team.
+
+    Yields (team_id, team, record) for the home and away side; preseason and
+    malformed games yield nothing.
+    """
+    if game.get('gameLabel') == 'Preseason':
+        return
+    home = game.get('homeTeam', {})
+    away = game.get('awayTeam', {})
+    try:
+        home_id = int(home.get('teamId', 0) or 0)
+        away_id = int(away.get('teamId', 0) or 0)
+    except Exception:
+        return
+    if not home_id or not away_id:
+        return
+
+    dt_local = parse_game_datetime(game)
+    date_str = parse_game_date(game, dt_local)
+    if not date_str:
+        return
+    time_str = format_time_pacific(dt_local)
+    tipoff = int(dt_local.timestamp()) if dt_local else None
+    status = FEED_STATUSES.get(game.get('gameStatus'), GAME_SCHEDULED)
+
+    for team_id, team, opponent, is_home in ((home_id, home, away, True), (away_id, away, home, False)):
+        wl, score, pts, plus_minus = parse_result(home, away, is_home, game.get('gameStatus'))
+        yield team_id, team, {
+            "id": game.get('gameId'),
+            "date": date_str,
+            "time": time_str,
+            "opponent": format_team_name(opponent),
+            "opponent_id": int(opponent.get('teamId', 0) or 0),
+            "isHome": is_home,
+            "location": game.get('arenaName') or (HOME_ARENAS.get(team_id, "Home") if is_home else "Away"),
+            "score": score,
+            "wl": wl,
+            "pts": int(pts),
+            "plus_minus": int(plus_minus),
+            "tipoff": tipoff,
+            "game_status": status,
+            "sort_key": game_sort_key(date_str, tipoff),
+        }
+
+class LeagueSplitter:
+    """Splits league feed games into per-team schedules in a single pass."""
+
+    def __init__(self):
+        self.schedules = {}
+        self.teams = {}
+
+    def add(self, game):
+        for team_id, team, record in team_game_records(game):
+            self.schedules.setdefault(team_id, []).append(record)
+            if team_id not in self.teams:
+                self.teams[team_id] = {"name": format_team_name(team), "tricode": team.get('teamTricode')}
+
+    def result(self):
+        for games in self.schedules.values():
+            games.sort(key=lambda x: x['sort_key'])
+        return self.schedules, self.teams
+
+def parse_league_schedule(payload):
     league = payload.get('leagueSchedule', {})
     season_year = league.get('seasonYear') or DEFAULT_SEASON
 
-    games = []
+    splitter = LeagueSplitter()
     for date_block in league.get('gameDates', []):
         for game in date_block.get('games', []):
-            if game.get('gameLabel') == 'Preseason':
-                continue
-            home = game.get('homeTeam', {})
-            away = game.get('awayTeam', {})
-            try:
-                home_id = int(home.get('teamId', 0) or 0)
-                away_id = int(away.get('teamId', 0) or 0)
-            except Exception:
-                continue
-            if WARRIORS_ID not in (home_id, away_id):
-                continue
+            splitter.add(game)
 
-            is_home = home_id == WARRIORS_ID
-            opponent = away if is_home else home
-            opponent_id = int(opponent.get('teamId', 0) or 0)
-            opponent_name = format_team_name(opponent)
+    schedules, teams = splitter.result()
+    return schedules, teams, season_year
 
-            dt_local = parse_game_datetime(game)
-            date_str = parse_game_date(game, dt_local)
-            if not date_str:
-                continue
-            time_str = format_time_pacific(dt_local)
+class PrefixedStream:
+    """File-like object that replays already-read bytes before the rest of a stream."""
 
-            wl, score, pts, plus_minus = parse_result(home, away, is_home, game.get('gameStatus'))
-            games.append({
-                "id": game.get('gameId'),
-                "date": date_str,
-                "time": time_str,
-                "opponent": opponent_name,
-                "opponent_id": opponent_id,
-                "isHome": is_home,
-                "location": game.get('arenaName') or ("Chase Center" if is_home else "Away"),
-                "score": score,
-                "wl": wl,
-                "pts": int(pts),
-                "plus_minus": int(plus_minus)
-            })
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
 
-    games.sort(key=lambda x: x['date'])
-    return games, season_year
+    def read(self, size=-1):
+        if self.head:
+            chunk = self.head if size < 0 else self.head[:size]
+            self.head = self.head[len(chunk):]
+            return chunk
+        return self.stream.read(size)
 
-def get_schedule_from_nba_api(season):
-    print("Fetching Schedule via nba_api fallback...")
+def peek_season_year(head):
+    # seasonYear precedes gameDates in the feed, so the first few KB are enough
     try:
-        finder = leaguegamefinder.LeagueGameFinder(team_id_nullable=WARRIORS_ID, season_nullable=season)
+        for prefix, _, value in ijson.parse(io.BytesIO(head)):
+            if prefix == 'leagueSchedule.seasonYear':
+                return value
+            if prefix.startswith('leagueSchedule.gameDates'):
+                break
+    except ijson.common.IncompleteJSONError:
+        pass
+    return None
+
+def stream_league_schedule(stream):
+    """Same result as parse_league_schedule(), built from a byte stream.
+
+    Only one game object is materialized at a time, so peak memory no longer
+    scales with the size of the league-wide feed.
+    """
+    head = stream.read(STREAM_HEAD_BYTES)
+    season_year = peek_season_year(head)
+
+    splitter = LeagueSplitter()
+    for game in ijson.items(PrefixedStream(head, stream), LEAGUE_GAME_PREFIX, use_float=True):
+        splitter.add(game)
+
+    schedules, teams = splitter.result()
+    return schedules, teams, season_year or DEFAULT_SEASON
+
+def get_schedule_from_nba_api(season, cancel=None):
+    if cancel is not None and cancel.cancelled:
+        return []
+    print(f"Fetching {season} schedule via nba_api...")
+    try:
+        with run_report.call('LeagueGameFinder', team_id=WARRIORS_ID) as call:
+            finder = leaguegamefinder.LeagueGameFinder(team_id_nullable=WARRIORS_ID, season_nullable=season)
+            call["bytes"] = response_bytes(finder)
         df = finder.get_data_frames()[0]
 
         games = []
@@ -189,105 +372,633 @@ def get_schedule_from_nba_api(season):
                 "score": score,
                 "wl": wl,
                 "pts": int(pts) if pd.notna(pts) else 0,
-                "plus_minus": int(plus_minus)
+                "plus_minus": int(plus_minus),
+                "tipoff": None,
+                "game_status": GAME_FINAL if wl else GAME_SCHEDULED,
+                "sort_key": game_sort_key(game_date_str, None),
             })
 
-        games.sort(key=lambda x: x['date'])
+        games.sort(key=lambda x: x['sort_key'])
         return games
     except Exception as e:
         print(f"Error fetching schedule via nba_api: {e}")
         return []
 
-def get_schedule():
+def merge_played_games(existing, played):
+    """The existing schedule with LeagueGameFinder results laid over it.
+
+    LeagueGameFinder only lists games already played, without tip-off times,
+    so it can't stand in for the whole schedule: unplayed games and the CDN's
+    times are kept, results are copied onto the matching rows, and played
+    games the schedule doesn't have yet are added.
+    """
+    by_id = {str(g['id']): g for g in played}
+    merged = []
+    for game in existing:
+        result = by_id.pop(str(game['id']), None)
+        if result is not None and result.get('wl'):
+            game = dict(game, **{field: result[field] for field in RESULT_FIELDS})
+        merged.append(game)
+    merged.extend(by_id.values())
+    merged.sort(key=lambda g: g['sort_key'])
+    return merged
+
+def get_schedule(validators=None, stream=True, hedge_after=HEDGE_AFTER, stage=None):
+    """Same result as get_schedule_from_cdn(), hedged with the nba_api schedule.
+
+    nba_api is started if the CDN fails or hasn't finished within hedge_after
+    seconds; the first source to return games wins and the other is cancelled.
+    A CDN download stops right away. An nba_api request already in flight runs
+    to completion and its result is dropped. Both run on daemon threads, so a
+    loser that is still waiting on the network doesn't hold up exit. The
+    winner goes in stage["source"].
+    """
+    tokens = {'cdn': CancelToken(), 'nba_api': CancelToken()}
+    results = queue.Queue()
+    started = []
+
+    def start(name, fetch, *args):
+        def target():
+            try:
+                results.put((name, fetch(*args), None))
+            except Exception as e:
+                results.put((name, None, e))
+        threading.Thread(target=target, name=f'schedule-{name}', daemon=True).start()
+        started.append(name)
+
+    def fallback():
+        games = get_schedule_from_nba_api(DEFAULT_SEASON, cancel=tokens['nba_api'])
+        if not games:
+            raise ValueError("no games")
+        # Keep the old validators: the CDN copy we last saw is still the latest we know of.
+        # The fallback only covers the Warriors; other teams keep their existing files.
+        return {WARRIORS_ID: merge_played_games(load_existing_schedule(), games)}, {}, DEFAULT_SEASON, \
+            validators or {}
+
+    start('cdn', get_schedule_from_cdn, validators, stream, tokens['cdn'])
+    running = 1
+    result = source = None
+    hedged = False
+    try:
+        while running and result is None:
+            try:
+                name, value, error = results.get(timeout=None if hedged else hedge_after)
+            except queue.Empty:
+                print(f"CDN schedule still loading after {hedge_after:g}s; starting nba_api as well.")
+            else:
+                running -= 1
+                if error is None:
+                    result, source = value, name
+                    break
+                print(f"{name} schedule fetch failed: {error}")
+            if not hedged:
+                hedged = True
+                start('nba_api', fallback)
+                running += 1
+    finally:
+        for name, token in tokens.items():
+            if name != source:
+                token.cancel()
+
+    if stage is not None:
+        stage["source"] = source
+        stage["hedged"] = hedged
+        stage["cancelled"] = sorted(set(started) - {source})
+    if result is None:
+        return {WARRIORS_ID: []}, {}, DEFAULT_SEASON, validators or {}
+    if hedged:
+        print(f"Using the {source} schedule.")
+    return result
+
+def load_existing_team_details():
+    path = os.path.join(DATA_DIR, 'team_details.json')
     try:
-        return get_schedule_from_cdn()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return {int(k): v for k, v in json.load(f).items()}
     except Exception as e:
-        print(f"CDN schedule fetch failed: {e}")
-        fallback_games = get_schedule_from_nba_api(DEFAULT_SEASON)
-        return fallback_games, DEFAULT_SEASON
+        print(f"Error loading existing team details: {e}")
+    return {}
+
+def load_existing_team_schedules():
+    schedules = {}
+    try:
+        with open(os.path.join(DATA_DIR, TEAMS_DIR, TEAMS_INDEX_FILE), 'r') as f:
+            index = json.load(f)
+        for team_id, entry in index.get('teams', {}).items():
+            with open(os.path.join(DATA_DIR, entry['file']), 'r') as f:
+                schedules[int(team_id)] = [upgrade_game(g) for g in schedule_games(json.load(f))]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading existing team schedules: {e}")
+    return schedules
+
+def load_cdn_state():
+    try:
+        with open(os.path.join(DATA_DIR, CDN_STATE_FILE), 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def finished_opponents(old_schedule, new_schedule):
+    """Opponents of games that gained (or changed) a result since the last run."""
+    old_results = {str(g['id']): (g.get('wl'), g.get('score')) for g in old_schedule}
+    return {
+        g['opponent_id'] for g in new_schedule
+        if g.get('wl') and old_results.get(str(g['id'])) != (g.get('wl'), g.get('score'))
+    }
+
+def finished_teams(old_schedules, new_schedules):
+    # Each team's rows name the other side as opponent, so this covers both teams of a game
+    changed = set()
+    for team_id, games in new_schedules.items():
+        changed |= finished_opponents(old_schedules.get(team_id, []), games)
+    return changed
+
+def fetch_team_details(opp_id, season, limiter):
+    print(f"Processing team {opp_id}...")
+    # 1. Get Record
+    # We can get this from TeamInfoCommon
+    info = call_with_backoff(
+        lambda: teaminfocommon.TeamInfoCommon(team_id=opp_id, season_nullable=season, timeout=STATS_TIMEOUT),
+        limiter, "TeamInfoCommon", team_id=opp_id)
+    info_df = info.team_info_common.get_data_frame()
+    record = "0-0"
+    if not info_df.empty:
+        w = info_df.iloc[0]['W']
+        l = info_df.iloc[0]['L']
+        record = f"{w}-{l}"
+
+    # 2. Get Top Scorers
+    stats = call_with_backoff(
+        lambda: leaguedashplayerstats.LeagueDashPlayerStats(team_id_nullable=opp_id, season=season, timeout=STATS_TIMEOUT),
+        limiter, "LeagueDashPlayerStats", team_id=opp_id)
+    stats_df = stats.league_dash_player_stats.get_data_frame()
+
+    return {
+        "record": record,
+        "scorers": top_scorers(stats_df)
+    }
 
-def get_team_details(schedule, season):
+def scorer_entry(p):
+    return {
+        "name": p['PLAYER_NAME'],
+        "ppg": round(p['PTS'] / p['GP'], 1),
+        "img": f"https://cdn.nba.com/headshots/nba/latest/1040x760/{p['PLAYER_ID']}.png"
+    }
+
+def top_scorers(stats_df):
+    if stats_df.empty:
+        return []
+    return [scorer_entry(p) for _, p in stats_df.nlargest(3, 'PTS').iterrows()]
+
+def get_team_details_bulk(opponent_ids, season, limiter):
+    """Records and top scorers for every opponent from two league-wide calls.
+
+    Matches the per-team path except around trades: league-wide player stats
+    list a traded player once, under their current team with full-season
+    totals, while the per-team call only counts their games for that team.
+    So a team's top scorers can differ between the two paths after a trade.
+    Records always match.
+    """
+    print("Fetching league standings and player stats in bulk...")
+    standings = call_with_backoff(
+        lambda: leaguestandingsv3.LeagueStandingsV3(season=season, timeout=STATS_TIMEOUT),
+        limiter, "LeagueStandingsV3")
+    standings_df = standings.standings.get_data_frame()
+    stats = call_with_backoff(
+        lambda: leaguedashplayerstats.LeagueDashPlayerStats(season=season, timeout=STATS_TIMEOUT),
+        limiter, "LeagueDashPlayerStats")
+    stats_df = stats.league_dash_player_stats.get_data_frame()
+
+    records = {}
+    if not standings_df.empty:
+        records = {
+            int(team_id): f"{w}-{l}"
+            for team_id, w, l in zip(standings_df['TeamID'], standings_df['WINS'], standings_df['LOSSES'])
+        }
+
+    # Top 3 per team in one groupby; nlargest keeps the per-team path's tie order
+    scorers = {}
+    if not stats_df.empty:
+        top_idx = stats_df.groupby('TEAM_ID', sort=False)['PTS'].nlargest(3).index.get_level_values(-1)
+        for team_id, team_top in stats_df.loc[top_idx].groupby('TEAM_ID', sort=False):
+            scorers[int(team_id)] = [scorer_entry(p) for _, p in team_top.iterrows()]
+
+    return {
+        opp_id: {
+            "record": records.get(opp_id, "0-0"),
+            "scorers": scorers.get(opp_id, [])
+        }
+        for opp_id in opponent_ids
+    }
+
+def get_team_details(schedule, season, workers=STATS_WORKERS, rate=STATS_RATE, bulk=True, only=None):
     print("Fetching Team Details (Records & Scorers)...")
     team_details = {}
     
-    # Get unique opponents
-    opponent_ids = set(g['opponent_id'] for g in schedule if g['opponent_id'] != 0)
-    
-    for opp_id in opponent_ids:
+    # Get unique opponents (bulk mode gets everyone for the same two calls
+    # anyway); the per-team path, fallback included, fetches only `only`
+    opponent_ids = sorted(set(g['opponent_id'] for g in schedule if g['opponent_id'] != 0))
+    per_team_ids = opponent_ids if only is None else [opp_id for opp_id in opponent_ids if opp_id in only]
+
+    # Workers overlap network latency; the shared bucket keeps the total
+    # request rate under the upstream limit no matter how many run at once
+    limiter = TokenBucket(rate=rate, burst=max(1, int(rate)))
+    start = time.monotonic()
+
+    if bulk:
         try:
-            print(f"Processing team {opp_id}...")
-            # 1. Get Record
-            # We can get this from TeamInfoCommon
-            time.sleep(0.600) # Rate limit
-            info = teaminfocommon.TeamInfoCommon(team_id=opp_id, season_nullable=season)
-            info_df = info.team_info_common.get_data_frame()
-            record = "0-0"
-            if not info_df.empty:
-                w = info_df.iloc[0]['W']
-                l = info_df.iloc[0]['L']
-                record = f"{w}-{l}"
-            
-            # 2. Get Top Scorers
-            time.sleep(0.600)
-            stats = leaguedashplayerstats.LeagueDashPlayerStats(team_id_nullable=opp_id, season=season)
-            stats_df = stats.league_dash_player_stats.get_data_frame()
-            
-            scorers = []
-            if not stats_df.empty:
-                top3 = stats_df.sort_values('PTS', ascending=False).head(3)
-                for _, p in top3.iterrows():
-                    scorers.append({
-                        "name": p['PLAYER_NAME'],
-                        "ppg": round(p['PTS'] / p['GP'], 1),
-                        "img": f"https://cdn.nba.com/headshots/nba/latest/1040x760/{p['PLAYER_ID']}.png"
-                    })
-            
-            team_details[opp_id] = {
-                "record": record,
-                "scorers": scorers
-            }
-            
+            team_details = get_team_details_bulk(opponent_ids, season, limiter)
+            print(f"Fetched {len(team_details)} teams in bulk in {time.monotonic() - start:.1f}s")
+            return team_details
         except Exception as e:
-            print(f"Error fetching details for {opp_id}: {e}")
-            continue
-            
-    return team_details
+            print(f"Bulk team details failed: {e}. Falling back to per-team requests.")
 
-def main():
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
-        
-    # 1. Generate Schedule
-    schedule, season_year = get_schedule()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_team_details, opp_id, season, limiter): opp_id for opp_id in per_team_ids}
+        for future in as_completed(futures):
+            opp_id = futures[future]
+            try:
+                team_details[opp_id] = future.result()
+            except Exception as e:
+                print(f"Error fetching details for {opp_id}: {e}")
+
+    print(f"Fetched {len(team_details)}/{len(per_team_ids)} teams in {time.monotonic() - start:.1f}s")
+    # Stable key order keeps team_details.json diffs meaningful
+    return {opp_id: team_details[opp_id] for opp_id in per_team_ids if opp_id in team_details}
+
+def write_if_changed(path, raw):
+    # Leave identical files untouched so unchanged runs produce no writes (or commits)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == raw:
+                return False
+    except OSError:
+        pass
+    # Replaced atomically: the API reads artifact bodies while serving
+    with open(path + '.tmp', 'wb') as f:
+        f.write(raw)
+    os.replace(path + '.tmp', path)
+    return True
+
+def write_json(name, data):
+    # Returns the exact bytes on disk so callers can fingerprint the file
+    raw = json.dumps(data, indent=2).encode('utf-8')
+    changed = write_if_changed(os.path.join(DATA_DIR, name), raw)
+    return raw, changed
+
+def write_team_schedules(schedules, teams):
+    """Write data/teams/<id>.json for every team but the Warriors, then the index.
+
+    The Warriors keep living in schedule.json; the index points there. The
+    index is written last and records a hash per file, so it changes whenever
+    any team file does (the API watches only the index).
+    """
+    teams_dir = os.path.join(DATA_DIR, TEAMS_DIR)
+    os.makedirs(teams_dir, exist_ok=True)
+    entries = {}
+    written = 0
+    for team_id in sorted(schedules):
+        if team_id == WARRIORS_ID:
+            name = 'schedule.json'
+            raw = json.dumps(schedule_document(schedules[team_id]), indent=2).encode('utf-8')
+        else:
+            name = f'{TEAMS_DIR}/{team_id}.json'
+            raw, changed = write_json(name, schedule_document(schedules[team_id]))
+            written += changed
+        meta = teams.get(team_id, {})
+        entries[str(team_id)] = {
+            "name": meta.get('name'),
+            "tricode": meta.get('tricode'),
+            "file": name,
+            "sha1": hashlib.sha1(raw).hexdigest(),
+        }
+    write_json(f'{TEAMS_DIR}/{TEAMS_INDEX_FILE}', {"teams": entries})
+    print(f"Saved schedules for {len(entries)} teams, {written} changed.")
+
+def write_response_artifacts(schedule, details, schedule_raw, details_raw, archive=None, stage=None):
+    version = snapshot_version(schedule_raw, details_raw, archive_revision(archive))
+    manifest_path = os.path.join(DATA_DIR, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == version and manifest.get('format') == ARTIFACT_FORMAT:
+            print(f"Response artifacts already current (version {version}).")
+            return
+    except Exception:
+        pass
+
+    # Round-trip details through JSON so keys match what the API loads (str ids)
+    manifest, files = build_artifacts(schedule, json.loads(details_raw), version, archive)
+    manifest["generated_at"] = datetime.now(timezone.utc).isoformat()
+
+    # Compressed copies go next to each body at full strength, so the API
+    # never compresses artifacts itself; a copy that wouldn't be smaller is omitted
+    artifact_dir = os.path.join(DATA_DIR, ARTIFACT_DIR)
+    written = 0
+    keep = set()
+    compression = CompressionStats()
+    for rel_path, body in files.items():
+        path = os.path.join(artifact_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        written += write_if_changed(path, body)
+        keep.add(rel_path)
+        start = time.perf_counter()
+        variants = compress_variants(body, ARTIFACT_LEVELS)
+        compression.add(body, variants, time.perf_counter() - start)
+        for encoding, compressed in variants.items():
+            write_if_changed(path + ARTIFACT_SUFFIXES[encoding], compressed)
+            keep.add(rel_path + ARTIFACT_SUFFIXES[encoding])
+
+    # Manifest goes last and atomically: the API only trusts artifacts whose
+    # manifest version matches the data files it loaded
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    # Drop bodies left over from games that are no longer in the schedule
+    for root, _, names in os.walk(artifact_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, artifact_dir).replace(os.sep, '/')
+            if rel_path != os.path.basename(MANIFEST_FILE) and rel_path not in keep:
+                os.remove(path)
+    print(f"Saved {len(files)} response artifacts, {written} changed (version {version}).")
+    print(f"Compressed artifacts: {compression.summary()}")
+    if stage is not None:
+        stage.update(compression.report())
+
+def load_team_schedule_raws():
+    # Raw bytes of every team file in the index, keyed by team id
+    raws = {}
+    try:
+        with open(os.path.join(DATA_DIR, TEAMS_DIR, TEAMS_INDEX_FILE), 'r') as f:
+            index = json.load(f)
+        for team_id, entry in index.get('teams', {}).items():
+            with open(os.path.join(DATA_DIR, entry['file']), 'rb') as f:
+                raws[int(team_id)] = f.read()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading existing team schedules: {e}")
+    return raws
+
+def write_binary_snapshot(schedule_raw, details_raw, archive=None):
+    # Built from the bytes on disk so the mmap'd copy matches what the API
+    # would otherwise parse, with a section per team in teams/index.json;
+    # replaced atomically because readers map it
+    revision = archive_revision(archive)
+    raws = {**load_team_schedule_raws(), WARRIORS_ID: schedule_raw}
+    schedules = {}
+    for team_id, raw in raws.items():
+        index = ScheduleIndex(schedule_games(json.loads(raw)))
+        schedules[team_id] = (snapshot_version(raw, details_raw, revision), index.games)
+    body = build_snapshot(schedules, json.loads(details_raw), snapshot_version(schedule_raw, details_raw, revision))
+    path = os.path.join(DATA_DIR, SNAPSHOT_FILE)
+    if body is None:
+        print(f"Data can't be represented in {SNAPSHOT_FILE}; the API will parse the JSON files.")
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == body:
+                print(f"{SNAPSHOT_FILE} unchanged.")
+                return
+    except OSError:
+        pass
+    with open(path + '.tmp', 'wb') as f:
+        f.write(body)
+    os.replace(path + '.tmp', path)
+    print(f"Saved {SNAPSHOT_FILE} ({len(body)} bytes, {len(schedules)} teams, "
+          f"{sum(len(games) for _, games in schedules.values())} games).")
+
+def write_outputs(schedule, details, schedule_raw, details_raw):
+    # Both outputs are stamped with the archive revision, like the API's version
+    archive = load_archive(DATA_DIR)
+    try:
+        with run_report.stage('artifacts') as stage:
+            write_response_artifacts(schedule, details, schedule_raw, details_raw, archive, stage)
+        with run_report.stage('binary_snapshot'):
+            write_binary_snapshot(schedule_raw, details_raw, archive)
+    finally:
+        if archive is not None:
+            archive.close()
+
+def open_archive():
+    # archive.sqlite is a local copy of the committed export: rebuilt when it
+    # is missing (fresh checkout, CI) or behind the export
+    path = os.path.join(DATA_DIR, ARCHIVE_FILE)
+    export_path = os.path.join(DATA_DIR, ARCHIVE_EXPORT_FILE)
+    revision = export_revision(export_path)
+    if revision is not None and os.path.exists(path):
+        archive = Archive(path, readonly=False)
+        if archive.revision == revision:
+            return archive
+        archive.close()
+        os.remove(path)
+    archive = Archive(path, readonly=False)
+    if revision is not None:
+        archive.restore(export_path)
+        print(f"Rebuilt {ARCHIVE_FILE} from {ARCHIVE_EXPORT_FILE} ({len(archive)} games).")
+    return archive
+
+def export_archive(archive):
+    if archive.export(os.path.join(DATA_DIR, ARCHIVE_EXPORT_FILE)):
+        print(f"Saved {ARCHIVE_EXPORT_FILE} (revision {archive.revision}).")
+
+def archive_schedules(schedules, season):
+    """Upsert every team's games into the archive; returns the rows changed."""
+    archive = open_archive()
+    try:
+        changed = archive.upsert((team_id, season, game) for team_id, games in schedules.items() for game in games)
+        print(f"Archived {season}: {changed} games changed, {len(archive)} in the archive.")
+        export_archive(archive)
+    finally:
+        archive.close()
+    return changed
+
+def season_label(year):
+    return f"{year}-{(year + 1) % 100:02d}"
+
+def parse_seasons(value):
+    # "2019-20,2021-22" or a range of start years like "2000-01:2024-25"
+    seasons = []
+    for part in value.split(','):
+        first, _, last = part.strip().partition(':')
+        seasons += [season_label(year) for year in range(int(first[:4]), int((last or first)[:4]) + 1)]
+    return seasons
+
+def backfill_archive(seasons, rate=STATS_RATE, full=False):
+    """Add past Warriors seasons from LeagueGameFinder; returns the rows changed.
+
+    Seasons already in the archive are skipped unless ``full``.
+    """
+    limiter = TokenBucket(rate)
+    archive = open_archive()
+    changed = 0
+    try:
+        have = set() if full else archive.seasons(WARRIORS_ID)
+        for season in seasons:
+            if season in have:
+                print(f"Season {season} already archived.")
+                continue
+            limiter.acquire()
+            games = get_schedule_from_nba_api(season)
+            changed += archive.upsert((WARRIORS_ID, season, game) for game in games)
+        print(f"Backfilled {len(seasons)} seasons: {changed} games changed, {len(archive)} in the archive.")
+        export_archive(archive)
+    finally:
+        archive.close()
+    return changed
+
+def rebuild_artifacts():
+    with open(os.path.join(DATA_DIR, 'schedule.json'), 'rb') as f:
+        schedule_raw = f.read()
+    with open(os.path.join(DATA_DIR, 'team_details.json'), 'rb') as f:
+        details_raw = f.read()
+    write_outputs(schedule_games(json.loads(schedule_raw)), json.loads(details_raw), schedule_raw, details_raw)
+
+def run(args):
+    configure_stats_http(args.stats_base_url, args.http_cache)
+
+    if args.backfill:
+        with run_report.stage('backfill') as stage:
+            stage["changed"] = backfill_archive(args.backfill, rate=args.rate, full=args.full)
+    if args.artifacts_only:
+        rebuild_artifacts()
+        return
+
+    # 1. Generate Schedules (one league feed, split per team)
+    cdn_state = {} if args.full else load_cdn_state()
+    with run_report.stage('schedule') as stage:
+        schedules, teams_meta, season_year, validators = get_schedule(cdn_state, stream=not args.no_stream,
+                                                                      hedge_after=args.hedge_after, stage=stage)
+        stage["changed"] = schedules is not None
+    if schedules is None:
+        print("Nothing changed upstream; leaving data files as they are.")
+        # Earlier seasons from a backfill change the head-to-head lists, and
+        # artifacts from an older format need rewriting; a no-op otherwise
+        rebuild_artifacts()
+        return
+    with run_report.stage('load_existing'):
+        existing = load_existing_schedule()
+        existing_schedules = load_existing_team_schedules()
+        existing_schedules[WARRIORS_ID] = existing
+    schedule = schedules.get(WARRIORS_ID)
     if not schedule:
         print("Schedule fetch returned no games. Falling back to existing data if available.")
-        existing = load_existing_schedule()
         if existing:
             schedule = existing
         else:
             raise RuntimeError("No schedule data available to write.")
-    with open(f'{DATA_DIR}/schedule.json', 'w') as f:
-        json.dump(schedule, f, indent=2)
-    print(f"Saved {len(schedule)} games to schedule.json")
-    
-    # 2. Generate Team Details
-    details = get_team_details(schedule, season_year)
-    with open(f'{DATA_DIR}/team_details.json', 'w') as f:
-        json.dump(details, f, indent=2)
-    print(f"Saved details for {len(details)} teams.")
-    
-    # NOTE: Real data fetching enabled.
-    # placeholder_details = {}
-    # for g in schedule:
-    #     opp_id = g['opponent_id']
-    #     if opp_id not in placeholder_details:
-    #         placeholder_details[opp_id] = {
-    #             "record": "N/A",
-    #             "scorers": []
-    #         }
-    # with open(f'{DATA_DIR}/team_details.json', 'w') as f:
-    #     json.dump(placeholder_details, f, indent=2)
-    # print("Saved placeholder team details.")
+    schedules[WARRIORS_ID] = schedule
+    with run_report.stage('write_schedules') as stage:
+        schedule_raw, schedule_changed = write_json('schedule.json', schedule_document(schedule))
+        print(f"Saved {len(schedule)} games to schedule.json" if schedule_changed else "schedule.json unchanged.")
+        if teams_meta:
+            write_team_schedules(schedules, teams_meta)
+        stage["teams"] = len(schedules)
+    with run_report.stage('archive') as stage:
+        stage["changed"] = archive_schedules(schedules, season_year)
+
+    # 2. Generate Team Details, shared by every team's schedule. Only teams
+    # whose games just finished (plus any we have never fetched) unless --full
+    with run_report.stage('team_details') as stage:
+        details = load_existing_team_details()
+        # The nba_api fallback only covers the Warriors; every other team keeps
+        # its existing file, and those games need details too (GSW's included)
+        served = schedules if teams_meta else {**existing_schedules, **schedules}
+        all_games = [g for games in served.values() for g in games]
+        opponents = set(g['opponent_id'] for g in all_games if g['opponent_id'] != 0)
+        refresh = opponents if args.full else (finished_teams(existing_schedules, schedules) & opponents) | \
+            (opponents - set(details))
+        stage["refreshed_teams"] = len(refresh)
+        missing = set()
+        if refresh:
+            fresh = get_team_details(all_games, season_year, workers=args.workers, rate=args.rate,
+                                     bulk=not args.per_team, only=refresh)
+            details.update(fresh)
+            missing = refresh - set(fresh)
+            stage["failed_teams"] = len(missing)
+        else:
+            print("No newly finished games; skipping team details.")
+        details = {opp_id: details[opp_id] for opp_id in sorted(opponents) if opp_id in details}
+        details_raw, details_changed = write_json('team_details.json', details)
+        print(f"Saved details for {len(details)} teams." if details_changed else "team_details.json unchanged.")
+
+    # 3. Pre-render API responses
+    write_outputs(schedule, details, schedule_raw, details_raw)
+
+    # 4. Remember the CDN validators last, once the data they describe is on
+    # disk. If any team's details failed, keep the old ones: the next run then
+    # gets the feed again instead of a 304, and retries those teams
+    if missing:
+        print(f"Details failed for {len(missing)} teams; not saving CDN validators so the next run retries.")
+    elif validators and validators != cdn_state:
+        write_json(CDN_STATE_FILE, validators)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate schedule and team data for the API.")
+    parser.add_argument('--artifacts-only', action='store_true',
+                        help="Only re-render response artifacts from the existing data files.")
+    parser.add_argument('--workers', type=int, default=STATS_WORKERS,
+                        help="Concurrent stats.nba.com requests for team details.")
+    parser.add_argument('--rate', type=float, default=STATS_RATE,
+                        help="Maximum stats.nba.com requests per second across all workers.")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore saved CDN validators and refetch details for every opponent.")
+    parser.add_argument('--no-stream', action='store_true',
+                        help="Parse the CDN schedule as one JSON document instead of streaming it.")
+    parser.add_argument('--hedge-after', type=float, default=HEDGE_AFTER, metavar='SECONDS',
+                        help="Also fetch the schedule via nba_api if the CDN hasn't finished after this long "
+                             "(0 starts both at once); the first to finish is used.")
+    parser.add_argument('--per-team', action='store_true',
+                        help="Fetch team details with two requests per opponent instead of two league-wide requests.")
+    parser.add_argument('--backfill', type=parse_seasons, metavar='SEASONS',
+                        help="Add past Warriors seasons to the archive first, e.g. 2019-20,2020-21 or 2000-01:2024-25.")
+    parser.add_argument('--http-cache', choices=HTTP_CACHE_MODES,
+                        help="Upstream response cache mode (default: $WARRIORS_HTTP_CACHE or 'on'). "
+                             "'offline' replays cached responses and never touches the network.")
+    parser.add_argument('--stats-base-url',
+                        help="Override the stats.nba.com base URL (e.g. a local stub server).")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Also write a cProfile dump ({PROFILE_FILE}) next to the data. "
+                             "Only the main thread is profiled; per-team workers show up as waits.")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_DIR):
+        os.makedirs(DATA_DIR)
+
+    # Stage and upstream call timings go to run_report.json, even when the run fails
+    run_report.info["args"] = vars(args)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    error = None
+    try:
+        run(args)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(DATA_DIR, PROFILE_FILE))
+            print(f"Saved {PROFILE_FILE}; inspect with: python -m pstats {os.path.join(DATA_DIR, PROFILE_FILE)}")
+        if current_cache() is not None:
+            run_report.info["http_cache"] = current_cache().stats()
+        report = run_report.write(DATA_DIR, error)
+        print(f"Run took {report['seconds']:.1f}s:")
+        run_report.print_summary()
+        if "http_cache" in run_report.info:
+            stats = run_report.info["http_cache"]
+            print(f"  http cache ({stats['mode']}): {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['entries']} entries, {stats['bytes']} B")
 
 if __name__ == "__main__":
     main()
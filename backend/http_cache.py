@@ -0,0 +1,301 @@
+"""Persistent cache for upstream HTTP responses (stats.nba.com, cdn.nba.com).
+
+CachingAdapter is a requests transport adapter, so everything sent through a
+session it is mounted on is covered, nba_api endpoint classes included (see
+upstream.configure_stats_http). Responses live in one SQLite file with a
+freshness deadline chosen per endpoint by response_ttl(). Earlier seasons and
+finished games never expire, so they are downloaded once.
+
+WARRIORS_HTTP_CACHE selects the mode:
+
+    on        serve fresh entries, fetch and store the rest (default)
+    refresh   fetch everything, store the results
+    offline   serve only from the cache, expired entries included; a miss
+              raises OfflineMiss instead of touching the network
+    off       no cache at all
+
+Requests that carry their own validators (If-None-Match, If-Modified-Since)
+always go to the network, except offline, where a matching validator
+replays as a 304.
+"""
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+HTTP_CACHE_ENV = 'WARRIORS_HTTP_CACHE'
+HTTP_CACHE_DIR_ENV = 'WARRIORS_HTTP_CACHE_DIR'
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+CACHE_FILE = 'responses.sqlite'
+MODES = ('on', 'refresh', 'offline', 'off')
+
+# Least recently used responses are evicted beyond this many body bytes
+MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds a current-season response stays fresh, by endpoint (last path
+# segment, lowercased). None means it never expires.
+ENDPOINT_TTL = {
+    'leaguestandingsv3': 15 * 60,
+    'teaminfocommon': 15 * 60,
+    'leaguedashplayerstats': 60 * 60,
+    'leaguegamefinder': 60 * 60,
+    'teamgamelog': 60 * 60,
+    # Revalidated with its ETag on every run; the copy is kept for offline mode
+    'scheduleleaguev2.json': 0,
+}
+DEFAULT_TTL = 10 * 60
+
+# Game-level endpoints: cached for good once the game is final
+GAME_ENDPOINT_PREFIXES = ('boxscore', 'playbyplay')
+LIVE_GAME_TTL = 60
+
+# Describe the encoded transfer, not the decoded body that gets stored
+DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+# Set on responses replayed from the cache
+CACHE_HEADER = 'X-Http-Cache'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_use ON responses (used_at);
+"""
+
+
+class OfflineMiss(Exception):
+    pass
+
+
+def current_season_start(today=None):
+    # Seasons are named by the year they start in; a new one counts from August
+    today = today or date.today()
+    return today.year if today.month >= 8 else today.year - 1
+
+
+def game_is_final(body):
+    # stats.nba.com game payloads carry GAME_STATUS_ID (3 = final) in a result set
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False
+    result_sets = payload.get('resultSets') or payload.get('resultSet') or []
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    for result_set in result_sets:
+        headers = result_set.get('headers') or []
+        if 'GAME_STATUS_ID' in headers:
+            i = headers.index('GAME_STATUS_ID')
+            return any(row[i] == 3 for row in result_set.get('rowSet') or [])
+    return False
+
+
+def response_ttl(url, body):
+    """Seconds the response stays fresh; None for never expires."""
+    parts = urlsplit(url)
+    endpoint = parts.path.rsplit('/', 1)[-1].lower()
+    if endpoint.startswith(GAME_ENDPOINT_PREFIXES):
+        return None if game_is_final(body) else LIVE_GAME_TTL
+    season = parse_qs(parts.query).get('Season', [''])[0]
+    if season[:4].isdigit() and int(season[:4]) < current_season_start():
+        return None
+    return ENDPOINT_TTL.get(endpoint, DEFAULT_TTL)
+
+
+class _Entry:
+    __slots__ = ('status', 'headers', 'body', 'expires_at')
+
+    def __init__(self, status, headers, body, expires_at):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    def fresh(self, now):
+        return self.expires_at is None or now < self.expires_at
+
+
+class ResponseCache:
+    def __init__(self, path, mode='on', max_bytes=MAX_BYTES):
+        if mode not in MODES:
+            raise ValueError(f"HTTP cache mode must be one of {', '.join(MODES)}, not {mode!r}")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def get(self, url):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE url = ?", (time.time(), url))
+        status, headers, body, expires_at = row
+        return _Entry(status, json.loads(headers), bytes(body), expires_at)
+
+    def put(self, url, status, headers, body):
+        ttl = response_ttl(url, body)
+        now = time.time()
+        headers = {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(headers), body, len(body), now, None if ttl is None else now + ttl, now))
+            self.counters['stores'] += 1
+            self._evict()
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY used_at").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.counters['evictions'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            return {"mode": self.mode, "entries": entries, "bytes": size, **self.counters}
+
+    def close(self):
+        self._conn.close()
+
+
+class _Recorder:
+    """Wraps a urllib3 response body and stores it once it has been read to the end.
+
+    The caller still streams (ijson reads the CDN feed as it downloads); the
+    decoded bytes are kept on the side and handed to on_complete at EOF.
+    """
+
+    def __init__(self, raw, on_complete):
+        self._raw = raw
+        self._chunks = []
+        self._on_complete = on_complete
+
+    def read(self, amt=None, *args, **kwargs):
+        data = self._raw.read(amt, decode_content=True)
+        if data:
+            self._chunks.append(data)
+        elif amt != 0 and self._on_complete is not None:
+            # read(0) is how ijson probes for bytes vs str; it isn't EOF
+            on_complete, self._on_complete = self._on_complete, None
+            on_complete(b''.join(self._chunks))
+            self._chunks = []
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        # A body closed before EOF is incomplete; don't store it
+        self._on_complete = None
+        self._raw.close()
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        while True:
+            data = self.read(amt)
+            if not data:
+                return
+            yield data
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+_hits = threading.local()
+
+
+def thread_hits():
+    """Cache hits served on this thread so far (lets callers skip rate limits)."""
+    return getattr(_hits, 'count', 0)
+
+
+class CachingAdapter(HTTPAdapter):
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, stream=False, **kwargs):
+        cache = self.cache
+        if cache is None or cache.mode == 'off' or request.method != 'GET':
+            return super().send(request, stream=stream, **kwargs)
+
+        validators = {k: request.headers[k] for k in ('If-None-Match', 'If-Modified-Since') if k in request.headers}
+        entry = cache.get(request.url) if cache.mode != 'refresh' else None
+        if entry is not None and (cache.mode == 'offline' or (not validators and entry.fresh(time.time()))):
+            cache.count('hits')
+            _hits.count = thread_hits() + 1
+            return self._replay(request, entry, validators)
+        if cache.mode == 'offline':
+            raise OfflineMiss(f"{request.url} is not in the HTTP cache ({cache.path})")
+
+        cache.count('misses')
+        response = super().send(request, stream=stream, **kwargs)
+        if response.status_code == 200:
+            url, status, headers = request.url, response.status_code, dict(response.headers)
+            response.raw = _Recorder(response.raw, lambda body: cache.put(url, status, headers, body))
+        return response
+
+    def _replay(self, request, entry, validators):
+        status, body = entry.status, entry.body
+        headers = CaseInsensitiveDict(entry.headers)
+        matches = (validators.get('If-None-Match') and validators['If-None-Match'] == headers.get('ETag')) or \
+            (validators.get('If-Modified-Since') and validators['If-Modified-Since'] == headers.get('Last-Modified'))
+        if matches:
+            status, body = 304, b''
+        headers['Content-Length'] = str(len(body))
+        headers[CACHE_HEADER] = 'hit'
+        raw = urllib3.HTTPResponse(body=io.BytesIO(body), headers=dict(headers), status=status, preload_content=False,
+                                   decode_content=False, request_method=request.method)
+        return self.build_response(request, raw)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache(mode=None):
+    """The process-wide cache (created on first use), or None when the mode is off."""
+    global _default
+    mode = mode or os.environ.get(HTTP_CACHE_ENV) or 'on'
+    if mode == 'off':
+        return None
+    with _default_lock:
+        if _default is None or _default.mode != mode:
+            cache_dir = os.environ.get(HTTP_CACHE_DIR_ENV) or CACHE_DIR
+            _default = ResponseCache(os.path.join(cache_dir, CACHE_FILE), mode)
+        return _default
+
+
+def current_cache():
+    return _default
@@ -0,0 +1,78 @@
+"""Serve recorded live scoreboard snapshots back, one step per request.
+
+    python backend/live_scores.py --game 0022500123 --record recordings/   # record a real game
+    python backend/live_replay.py recordings/ --port 8771
+    NBA_LIVE_SCOREBOARD_URL=http://127.0.0.1:8771/ python backend/live_scores.py --game 0022500123 --speed 50
+
+Snapshots are played in file-name order; every GET advances to the next one
+and the last is repeated. Responses carry an ETag, so a conditional request
+for an unchanged snapshot gets a 304 like the real CDN.
+"""
+import argparse
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Replay:
+    def __init__(self, directory):
+        names = sorted(n for n in os.listdir(directory) if n.endswith('.json'))
+        if not names:
+            raise ValueError(f"No .json snapshots in {directory}")
+        self.snapshots = []
+        for name in names:
+            with open(os.path.join(directory, name), 'rb') as f:
+                body = f.read()
+            self.snapshots.append((name, body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"'))
+        self.position = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            snapshot = self.snapshots[self.position]
+            self.position = min(self.position + 1, len(self.snapshots) - 1)
+            return snapshot
+
+
+def make_handler(replay):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            name, body, etag = replay.next()
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('X-Replay-Snapshot', name)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help="directory of recorded scoreboard .json files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8771)
+    args = parser.parse_args()
+
+    replay = Replay(args.directory)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(replay))
+    print(f"Replaying {len(replay.snapshots)} snapshots on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from data_store import GAME_FINAL, GAME_LIVE, store
+
+LIVE_SCOREBOARD_URL = 'https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json'
+
+# Point the poller at another feed (e.g. live_replay.py) without code changes
+LIVE_SCOREBOARD_URL_ENV = 'NBA_LIVE_SCOREBOARD_URL'
+
+# Set to any non-empty value to start the poller inside the Flask app
+LIVE_SCORES_ENV = 'LIVE_SCORES'
+
+# Scoreboard gameStatus values
+PREGAME, IN_PROGRESS, FINAL = 1, 2, 3
+
+# A game window opens shortly before tip-off and closes when the game is
+# final, or after GAME_WINDOW at the latest
+PREGAME_LEAD = 15 * 60
+GAME_WINDOW = 4 * 3600
+
+# Poll intervals (seconds)
+POLL_PREGAME = 60
+POLL_LIVE = 20
+POLL_CLOSE = 5
+POLL_BREAK = 60
+IDLE_CHECK = 15 * 60
+MAX_ERROR_BACKOFF = 300
+
+# "Close" means the 4th quarter or overtime, inside the last five minutes,
+# within two possessions-and-change
+CLOSE_PERIOD = 4
+CLOSE_CLOCK = 5 * 60
+CLOSE_MARGIN = 8
+
+CLOCK_RE = re.compile(r'PT(?:(\d+)M)?(?:([\d.]+)S)?')
+
+
+def parse_clock(value):
+    # Scoreboard clocks are ISO-8601 durations like "PT05M12.00S"; None if unknown
+    match = CLOCK_RE.fullmatch(value or '')
+    if not match or not any(match.groups()):
+        return None
+    return int(match.group(1) or 0) * 60 + float(match.group(2) or 0)
+
+
+def team_sides(live_game, team_id):
+    home, away = live_game.get('homeTeam', {}), live_game.get('awayTeam', {})
+    return (home, away) if home.get('teamId') == team_id else (away, home)
+
+
+def poll_interval(live_game, team_id):
+    """Seconds until the next poll for this game, or None once it is final."""
+    status = live_game.get('gameStatus')
+    if status == FINAL:
+        return None
+    if status != IN_PROGRESS:
+        return POLL_PREGAME
+    ours, theirs = team_sides(live_game, team_id)
+    margin = abs(int(ours.get('score') or 0) - int(theirs.get('score') or 0))
+    clock = parse_clock(live_game.get('gameClock'))
+    if clock == 0:
+        # Between quarters or at halftime nothing changes for a while
+        return POLL_BREAK
+    if live_game.get('period', 0) >= CLOSE_PERIOD and clock is not None and clock <= CLOSE_CLOCK \
+            and margin <= CLOSE_MARGIN:
+        return POLL_CLOSE
+    return POLL_LIVE
+
+
+def game_patch(live_game, team_id):
+    """Schedule fields to overlay for a live or finished game, or None before tip-off."""
+    status = live_game.get('gameStatus')
+    if status not in (IN_PROGRESS, FINAL):
+        return None
+    ours, theirs = team_sides(live_game, team_id)
+    pts, opp_pts = int(ours.get('score') or 0), int(theirs.get('score') or 0)
+    if status == FINAL:
+        wl = 'W' if pts > opp_pts else 'L'
+        return {"wl": wl, "pts": pts, "plus_minus": pts - opp_pts, "score": f"{wl} {pts}-{opp_pts}",
+                "game_status": GAME_FINAL}
+    return {"pts": pts, "plus_minus": pts - opp_pts, "status": (live_game.get('gameStatusText') or '').strip(),
+            "game_status": GAME_LIVE}
+
+
+def game_window(snapshot, now):
+    """Returns (game, opens_at) for the game whose window is open or opens next.
+
+    Games with a result or an unknown tip-off time are skipped.
+    """
+    index = snapshot.index
+    # Games are keyed by tip-off, so anything keyed before now - GAME_WINDOW has closed
+    for i in range(bisect_left(index.keys, now - GAME_WINDOW), len(index.games)):
+        game, tip = index.games[i], index.tips[i]
+        if tip is None or game.get('wl') or now >= tip + GAME_WINDOW:
+            continue
+        return game, tip - PREGAME_LEAD
+    return None, None
+
+
+class LiveScorePoller:
+    """Polls the live scoreboard during the Warriors' game windows and patches the store."""
+
+    def __init__(self, data_store=store, url=None, session=None, clock=time.time, game_id=None, record_dir=None,
+                 speed=1.0):
+        self.store = data_store
+        self.url = url or os.environ.get(LIVE_SCOREBOARD_URL_ENV) or LIVE_SCOREBOARD_URL
+        if session is None:
+            # Imported here so the API doesn't pay for requests unless live mode is on
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.clock = clock
+        self.game_id = game_id
+        self.record_dir = record_dir
+        # Divides every wait; lets a replay run in seconds instead of hours
+        self.speed = speed
+        self.failures = 0
+        self.etag = None
+        self.scoreboard = None
+        self.polls = 0
+        self.last_patch = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def fetch(self):
+        # Conditional GET: the CDN answers 304 until the scoreboard changes
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; WarriorsSchedule/1.0)", "Accept": "application/json"}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        response = self.session.get(self.url, headers=headers, timeout=10)
+        self.polls += 1
+        if response.status_code == 304 and self.scoreboard is not None:
+            return self.scoreboard
+        response.raise_for_status()
+        self.etag = response.headers.get('ETag')
+        self.scoreboard = response.json().get('scoreboard', {})
+        if self.record_dir:
+            path = os.path.join(self.record_dir, f"{int(self.clock() * 1000)}.json")
+            with open(path, 'wb') as f:
+                f.write(response.content)
+        return self.scoreboard
+
+    def poll_once(self):
+        """Poll if a game window is open; returns the seconds to wait before the next call."""
+        snapshot = self.store.get()
+        now = self.clock()
+        if self.game_id is not None:
+            game = snapshot.index.game(self.game_id)
+            if game is None or game.get('wl'):
+                return None
+        else:
+            game, opens_at = game_window(snapshot, now)
+            if game is None:
+                return IDLE_CHECK
+            if now < opens_at:
+                return min(IDLE_CHECK, opens_at - now)
+
+        try:
+            scoreboard = self.fetch()
+        except Exception as e:
+            self.failures += 1
+            delay = min(MAX_ERROR_BACKOFF, POLL_LIVE * 2 ** self.failures)
+            print(f"Live scoreboard fetch failed ({e}); retrying in {delay}s")
+            return delay
+        self.failures = 0
+
+        live_game = next((g for g in scoreboard.get('games', []) if str(g.get('gameId')) == str(game['id'])), None)
+        if live_game is None:
+            return POLL_PREGAME
+        patch = game_patch(live_game, snapshot.team_id)
+        if patch is not None and any(game.get(k) != v for k, v in patch.items()):
+            self.store.apply_live({game['id']: patch})
+            self.last_patch = {"game_id": game['id'], "at": now, **patch}
+            print(f"Live update {game['id']} vs {game['opponent']}: {patch}")
+        interval = poll_interval(live_game, snapshot.team_id)
+        if interval is None:
+            # Final; look for the next window straight away
+            return 0 if self.game_id is None else None
+        return interval
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.poll_once()
+            except Exception as e:
+                print(f"Live poller error: {e}")
+                delay = MAX_ERROR_BACKOFF
+            if delay is None:
+                break
+            self._stop.wait(delay / self.speed)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='live-scores', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def state(self):
+        return {
+            "url": self.url,
+            "polls": self.polls,
+            "failures": self.failures,
+            "last_patch": self.last_patch,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+def start_live_poller():
+    # Opt-in: a serverless deployment has no long-lived process to poll from
+    if not os.environ.get(LIVE_SCORES_ENV):
+        return None
+    print("Starting live score poller")
+    return LiveScorePoller().start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll the live scoreboard and print schedule patches")
+    parser.add_argument('--url', help="scoreboard URL (e.g. a live_replay.py server)")
+    parser.add_argument('--game', help="poll this game id now instead of waiting for its window")
+    parser.add_argument('--record', metavar='DIR', help="save every scoreboard response to DIR for replay")
+    parser.add_argument('--speed', type=float, default=1.0, help="divide poll intervals by this factor")
+    args = parser.parse_args()
+
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    poller = LiveScorePoller(url=args.url, game_id=args.game, record_dir=args.record, speed=args.speed)
+    try:
+        poller.run()
+    except KeyboardInterrupt:
+        pass
+    game = store.get().index.game(args.game) if args.game else None
+    if game is not None:
+        print(json.dumps(game, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Only what the API needs: labelled counters and histograms updated on the
+request path, plus collectors that read gauges and counters other objects
+already keep (cache counters, snapshot age) at scrape time. Each process
+keeps its own values; with several workers, scrape each one.
+"""
+import math
+import threading
+from bisect import bisect_left
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        lines += [f'{self.name}{_labels(self.labelnames, k)} {_number(v)}' for k, v in values]
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions."""
+
+    def __init__(self, name, help, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        # Buckets are counted individually and summed into "le" at render time
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            series = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, buckets, labelnames=()):
+        metric = Histogram(name, help, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """Register fn() -> iterable of (name, type, help, labelnames, [(labels, value)]).
+
+        Called on every scrape; usable as a decorator.
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for fn in self._collectors:
+            for name, kind, help, labelnames, samples in fn():
+                lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+                lines += [f'{name}{_labels(labelnames, labels)} {_number(value)}' for labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
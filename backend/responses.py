@@ -0,0 +1,76 @@
+import json
+import urllib.parse
+
+from data_store import ARTIFACT_FORMAT, DEFAULT_TEAM_NAME, DEFAULT_TRICODE, WARRIORS_ID, ScheduleIndex, day_start, head_to_head
+
+# Number of upcoming games returned by /api/schedule
+UPCOMING_LIMIT = 10
+
+
+def dump_body(data):
+    # Same compact, key-sorted encoding Flask's jsonify uses
+    return json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8') + b'\n'
+
+
+def youtube_link(game, team_name=DEFAULT_TEAM_NAME):
+    query = f"{team_name} vs {game['opponent']} {game['date']} highlights"
+    return f"https://www.youtube.com/results?search_query={urllib.parse.quote(query)}"
+
+
+def last_game_body(game, team_name=DEFAULT_TEAM_NAME, tricode=DEFAULT_TRICODE):
+    return {
+        "id": game['id'],
+        "date": game['date'],
+        "matchup": f"{tricode} vs {game['opponent']}" if game['isHome'] else f"{tricode} @ {game['opponent']}",
+        "opponent": game['opponent'],
+        "wl": game['wl'],
+        "pts": game['pts'],
+        "plus_minus": game['plus_minus'],
+        "youtubeLink": youtube_link(game, team_name)
+    }
+
+
+def game_details_body(game, team_details, h2h_games):
+    details = team_details.get(str(game['opponent_id']), {"record": "N/A", "scorers": []})
+    return {
+        "opponent": game['opponent'],
+        "record": details['record'],
+        "scorers": details['scorers'],
+        "h2h": [{"date": g['date'], "score": g['score'], "result": g['wl']} for g in h2h_games]
+    }
+
+
+def build_artifacts(schedule, team_details, version, archive=None):
+    """Render every API response the data can produce.
+
+    Returns (manifest, files) where files maps paths relative to the artifact
+    directory to encoded bodies. The manifest is what data_store.ResponseArtifacts
+    reads back to pick the right variant at request time. ``archive`` adds
+    earlier seasons to each game's head-to-head list.
+    """
+    index = ScheduleIndex(schedule)
+    files = {}
+    manifest = {"version": version, "format": ARTIFACT_FORMAT, "last_game": [], "upcoming": [], "games": {}}
+
+    for starts_at, game in index.last_game_timeline():
+        path = f"last-game/{game['id']}.json"
+        files[path] = dump_body(last_game_body(game))
+        manifest["last_game"].append({"from": starts_at, "file": path})
+
+    # The upcoming list only changes when "today" passes an unplayed game's date,
+    # so one variant per such date covers every day of the season
+    unplayed_dates = sorted({g['date'] for g in index.games if not g.get('wl')})
+    for date in unplayed_dates:
+        games, next_cursor = index.window(start=day_start(date), limit=UPCOMING_LIMIT, unplayed_only=True)
+        path = f"upcoming/{date}.json"
+        files[path] = dump_body(games)
+        manifest["upcoming"].append({"through": date, "file": path, "next_cursor": next_cursor})
+
+    for game in index.games:
+        game_id = str(game['id'])
+        path = f"game/{game_id}.json"
+        h2h = head_to_head(index, archive, WARRIORS_ID, game['opponent_id'])
+        files[path] = dump_body(game_details_body(game, team_details, h2h))
+        manifest["games"][game_id] = path
+
+    return manifest, files
@@ -0,0 +1,110 @@
+"""Timings for one generate_data.py run, written next to the data files.
+
+Stages are the top-level pipeline steps. Calls are individual upstream
+requests (the CDN schedule, each stats.nba.com endpoint) with their size,
+retries and the time spent waiting on the rate limiter or backing off.
+The report is rewritten on every run, failed ones included, so CI can keep
+it as a build artifact and compare runs over time.
+"""
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_FILE = 'run_report.json'
+PROFILE_FILE = 'run_profile.pstats'
+
+
+def _error(e):
+    return f"{e.__class__.__name__}: {e}"
+
+
+class RunReport:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = []
+        self.calls = []
+        self.info = {}
+        self._lock = threading.Lock()
+
+    def _offset(self):
+        return round(time.perf_counter() - self.started, 4)
+
+    @contextmanager
+    def _timed(self, entries, entry):
+        entry["start"] = self._offset()
+        start = time.perf_counter()
+        try:
+            yield entry
+        except BaseException as e:
+            entry["error"] = _error(e)
+            raise
+        finally:
+            entry["seconds"] = round(time.perf_counter() - start, 4)
+            with self._lock:
+                entries.append(entry)
+
+    def stage(self, name):
+        """Time one pipeline step; the yielded dict takes extra fields (counts, flags)."""
+        return self._timed(self.stages, {"name": name})
+
+    def call(self, endpoint, team_id=None):
+        """Time one upstream request; callers fill in bytes, retries and sleep_seconds."""
+        return self._timed(self.calls, {"endpoint": endpoint, "team_id": team_id, "bytes": None,
+                                        "retries": 0, "sleep_seconds": 0.0})
+
+    def summary(self):
+        with self._lock:
+            calls = list(self.calls)
+        endpoints = {}
+        for call in calls:
+            total = endpoints.setdefault(call["endpoint"], {
+                "calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+                "bytes": 0, "retries": 0, "sleep_seconds": 0.0,
+            })
+            total["calls"] += 1
+            total["errors"] += "error" in call
+            total["seconds"] += call["seconds"]
+            total["max_seconds"] = max(total["max_seconds"], call["seconds"])
+            total["bytes"] += call["bytes"] or 0
+            total["retries"] += call["retries"]
+            total["sleep_seconds"] += call["sleep_seconds"]
+        for total in endpoints.values():
+            for key in ("seconds", "max_seconds", "sleep_seconds"):
+                total[key] = round(total[key], 4)
+        return endpoints
+
+    def write(self, data_dir, error=None):
+        report = {
+            "started_at": self.started_at.isoformat(timespec='seconds'),
+            "seconds": self._offset(),
+            "ok": error is None,
+            "error": _error(error) if error is not None else None,
+            "python": platform.python_version(),
+            **self.info,
+            "stages": sorted(self.stages, key=lambda s: s["start"]),
+            "endpoints": self.summary(),
+            "calls": sorted(self.calls, key=lambda c: c["start"]),
+        }
+        path = os.path.join(data_dir, REPORT_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(path + '.tmp', path)
+        return report
+
+    def print_summary(self):
+        for stage in sorted(self.stages, key=lambda s: s["start"]):
+            print(f"  {stage['name']:<24} {stage['seconds']:>8.2f}s")
+        for endpoint, total in sorted(self.summary().items()):
+            print(f"  {endpoint:<24} {total['seconds']:>8.2f}s  {total['calls']} calls, {total['bytes']} B, "
+                  f"{total['retries']} retries, {total['sleep_seconds']:.1f}s waiting")
+
+
+run_report = RunReport()
@@ -0,0 +1,135 @@
+"""Standalone asyncio server for /api/stream.
+
+    python backend/stream_server.py --port 5001
+
+Each connection is a coroutine waiting on a shared event, so thousands of idle
+streams cost a few KB each instead of a worker thread. Flask's own
+/api/stream route is fine for development. In production, run this one on
+its own origin and build the frontend with VITE_STREAM_URL pointing at it.
+"""
+import argparse
+import asyncio
+from urllib.parse import parse_qs
+
+from data_store import CHECK_INTERVAL, store
+from events import HEARTBEAT, HEARTBEAT_SECONDS, event_log
+from live_scores import start_live_poller
+
+STREAM_PATH = '/api/stream'
+HEADER_TIMEOUT = 10
+
+STREAM_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"X-Accel-Buffering: no\r\n\r\n"
+)
+
+
+class StreamServer:
+    def __init__(self, log=event_log, data_store=store):
+        self.log = log
+        self.store = data_store
+        self.connections = 0
+        # Created on first use, from inside the running loop: on Python 3.9 an
+        # Event binds to the loop that is current when it is constructed
+        self._changed = None
+
+    def _event(self):
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    def _wake(self):
+        # Wake every waiting connection, then hand out a fresh event for the next change
+        changed, self._changed = self._changed, asyncio.Event()
+        if changed is not None:
+            changed.set()
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        return method, target, headers
+
+    async def handle(self, reader, writer):
+        try:
+            method, target, headers = await asyncio.wait_for(self.read_request(reader), HEADER_TIMEOUT)
+            path, _, query = target.partition('?')
+            if method != 'GET' or path != STREAM_PATH:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            last_event_id = headers.get('last-event-id') or parse_qs(query).get('lastEventId', [None])[0]
+
+            self.connections += 1
+            try:
+                preamble, cursor = self.log.open(last_event_id)
+                writer.write(STREAM_HEADERS + preamble)
+                await writer.drain()
+                while True:
+                    changed = self._event()
+                    # A publish during drain() wakes the event we haven't taken yet,
+                    # so only wait when the log hasn't moved past our cursor
+                    if self.log.last_id == cursor:
+                        try:
+                            await asyncio.wait_for(changed.wait(), HEARTBEAT_SECONDS)
+                        except asyncio.TimeoutError:
+                            writer.write(HEARTBEAT)
+                            await writer.drain()
+                            continue
+                    body, cursor = self.log.read(cursor)
+                    if body:
+                        writer.write(body)
+                        await writer.drain()
+            finally:
+                self.connections -= 1
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def watch_store(self):
+        # Pick up regenerated data files; changes reach the log through the swap listener
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(CHECK_INTERVAL)
+            await loop.run_in_executor(None, self.store.get)
+
+    async def serve(self, host, port):
+        loop = asyncio.get_running_loop()
+        self.log.add_waker(lambda: loop.call_soon_threadsafe(self._wake))
+        self.store.on_swap(self.log.publish_changes)
+        self.store.reload()
+        start_live_poller()
+        watcher = asyncio.create_task(self.watch_store())
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"Streaming {STREAM_PATH} on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve /api/stream from an asyncio event loop")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    args = parser.parse_args()
+    try:
+        asyncio.run(StreamServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
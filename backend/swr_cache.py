@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Entry:
+    __slots__ = ('value', 'version', 'computed_at', 'fresh_until', 'stale_until', 'compute_seconds', 'hits')
+
+    def __init__(self, value, version, now, fresh, stale, compute_seconds):
+        self.value = value
+        self.version = version
+        self.computed_at = now
+        self.fresh_until = now + fresh
+        self.stale_until = now + fresh + stale
+        self.compute_seconds = compute_seconds
+        self.hits = 0
+
+
+class SWRCache:
+    """TTL cache that serves stale entries while one worker recomputes them.
+
+    Each entry is fresh for ``fresh`` seconds, then servable-but-stale for
+    another ``stale`` seconds. A stale hit (or a hit computed from an older
+    data version) returns immediately and queues a single background refresh
+    for that key; only a miss or an entry past its stale window makes the
+    request compute inline.
+    """
+
+    def __init__(self, fresh, stale, name='cache'):
+        self.fresh = fresh
+        self.stale = stale
+        self.name = name
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'{name}-refresh')
+        self.counters = {'fresh_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+        self.last_refresh = None
+
+    def _compute(self, key, compute, version):
+        start = time.monotonic()
+        value = compute()
+        now = time.monotonic()
+        entry = _Entry(value, version, now, self.fresh, self.stale, now - start)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _refresh(self, key, compute, version):
+        try:
+            entry = self._compute(key, compute, version)
+            with self._lock:
+                self.counters['refreshes'] += 1
+                self.last_refresh = {'key': str(key), 'at': time.time(), 'seconds': entry.compute_seconds}
+        except Exception as e:
+            print(f"{self.name}: background refresh of {key} failed: {e}")
+            with self._lock:
+                self.counters['refresh_errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key, compute, version=None):
+        """Return the cached value for key, computing it with compute() as needed.
+
+        ``version`` identifies the data the value was built from; a newer
+        version makes the entry stale rather than forcing an inline rebuild.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                entry.hits += 1
+                if now < entry.fresh_until and entry.version == version:
+                    self.counters['fresh_hits'] += 1
+                    return entry.value
+                self.counters['stale_hits'] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    self._worker.submit(self._refresh, key, compute, version)
+                return entry.value
+            self.counters['misses'] += 1
+        return self._compute(key, compute, version).value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def state(self):
+        """Snapshot of counters and per-entry timing, for the debug endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            entries = {
+                str(key): {
+                    'version': entry.version,
+                    'age': round(now - entry.computed_at, 3),
+                    'fresh_for': round(max(0.0, entry.fresh_until - now), 3),
+                    'stale_for': round(max(0.0, entry.stale_until - now), 3),
+                    'compute_ms': round(entry.compute_seconds * 1000, 3),
+                    'hits': entry.hits,
+                    'refreshing': key in self._refreshing,
+                }
+                for key, entry in self._entries.items()
+            }
+            return {
+                'name': self.name,
+                'fresh_seconds': self.fresh,
+                'stale_seconds': self.stale,
+                'counters': dict(self.counters),
+                'last_refresh': self.last_refresh,
+                'entries': entries,
+            }
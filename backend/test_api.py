@@ -1,5 +1,8 @@
 from nba_api.stats.endpoints import leaguegamefinder
 import pandas as pd
+from upstream import configure_stats_http
+
+configure_stats_http()
 
 game_id = '0022500256' 
 print(f"Testing Game ID: {game_id}")
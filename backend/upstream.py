@@ -0,0 +1,148 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from nba_api.stats.library.http import NBAStatsHTTP
+
+from http_cache import CachingAdapter, default_cache, thread_hits
+from run_report import run_report
+
+# Point nba_api at another host (e.g. a local stub server) without code changes
+STATS_BASE_URL_ENV = 'NBA_STATS_BASE_URL'
+
+# HTTP statuses stats.nba.com uses when it wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+class UpstreamThrottled(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every worker hitting one upstream.
+
+    The rate adapts AIMD-style: throttling or timeouts halve it (down to
+    min_rate), each success creeps back towards the configured ceiling.
+    """
+
+    def __init__(self, rate, burst=1, min_rate=None):
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 4
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def refund(self):
+        # Give back the token of a request that never reached the upstream
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def backoff(self, pause=0.0):
+        # Halve the rate and optionally stop everyone for `pause` seconds
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + 0.05 * self.max_rate)
+
+
+def _raise_on_throttle(response, *args, **kwargs):
+    # nba_api only sees the body, so surface throttling before it tries to parse JSON
+    if response.status_code in THROTTLE_STATUSES:
+        try:
+            retry_after = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            retry_after = None
+        raise UpstreamThrottled(f"HTTP {response.status_code}", retry_after)
+
+
+def configure_stats_http(base_url=None, cache_mode=None):
+    """Install a pooled session (with throttle detection) for all nba_api stats calls.
+
+    The session goes through the persistent HTTP cache (see http_cache.py);
+    use http_session() for other upstream requests so they share it.
+    """
+    session = requests.Session()
+    adapter = CachingAdapter(default_cache(cache_mode), pool_connections=4, pool_maxsize=16)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(_raise_on_throttle)
+    NBAStatsHTTP.set_session(session)
+
+    base_url = base_url or os.environ.get(STATS_BASE_URL_ENV)
+    if base_url:
+        NBAStatsHTTP.base_url = base_url.rstrip('/') + '/{endpoint}'
+        print(f"Using stats base URL {NBAStatsHTTP.base_url}")
+    return session
+
+
+def http_session():
+    return NBAStatsHTTP.get_session()
+
+
+def response_bytes(result):
+    # nba_api endpoints keep the raw response text
+    try:
+        return len(result.nba_response.get_response().encode('utf-8'))
+    except (AttributeError, TypeError):
+        return None
+
+
+def call_with_backoff(fn, limiter, endpoint, team_id=None, retries=4, base_delay=1.0):
+    """Run fn() under the shared limiter, retrying throttles and timeouts.
+
+    Recorded in the run report with its retries, size and the time spent
+    waiting for the limiter (which includes backoff pauses).
+    """
+    label = endpoint if team_id is None else f"{endpoint} {team_id}"
+    with run_report.call(endpoint, team_id) as call:
+        for attempt in range(retries + 1):
+            call["sleep_seconds"] += limiter.acquire()
+            hits = thread_hits()
+            try:
+                result = fn()
+            except (UpstreamThrottled, requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if attempt == retries:
+                    raise
+                delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                if getattr(e, 'retry_after', None):
+                    delay = max(delay, e.retry_after)
+                print(f"{label}: {e.__class__.__name__} ({e}); retrying in {delay:.1f}s")
+                call["retries"] += 1
+                limiter.backoff(pause=delay)
+                continue
+            if thread_hits() > hits:
+                # Served from the HTTP cache: stats.nba.com never saw it
+                limiter.refund()
+                call["cached"] = True
+            else:
+                limiter.success()
+            call["bytes"] = response_bytes(result)
+            return result
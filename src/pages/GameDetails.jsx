@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, Link, useLocation } from 'react-router-dom';
 import { getTeamLogo } from '../utils/logos';
+import { subscribeToUpdates } from '../utils/liveUpdates';
 
 const GameDetails = () => {
   const { id } = useParams();
@@ -12,9 +13,9 @@ const GameDetails = () => {
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    const fetchGameDetails = async () => {
+    const fetchGameDetails = async (background = false) => {
       try {
-        setLoading(true);
+        if (!background) setLoading(true);
         const res = await fetch(`/api/game/${id}`);
         if (!res.ok) {
           throw new Error('Game not found');
@@ -30,6 +31,8 @@ const GameDetails = () => {
     };
 
     fetchGameDetails();
+
+    return subscribeToUpdates(() => fetchGameDetails(true));
   }, [id]);
 
   // Fallback to initial state if API fails or is loading
@@ -86,7 +89,7 @@ const GameDetails = () => {
 
       {displayGame.h2h.length > 0 && (
         <div className="glass-card h2h-card">
-          <h3>Season Matchups</h3>
+          <h3>Recent Matchups</h3>
           <ul className="h2h-list">
             {displayGame.h2h.map((match, index) => (
               <li key={index} className="h2h-item">
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import NextGame from '../components/NextGame';
 import LastGame from '../components/LastGame';
 import ScheduleList from '../components/ScheduleList';
+import { subscribeToUpdates } from '../utils/liveUpdates';
 
 function Home() {
   const [lastGame, setLastGame] = useState(null);
@@ -12,40 +13,30 @@ function Home() {
   useEffect(() => {
     console.log("Home: useEffect triggered");
     
-    const fetchLastGame = async () => {
+    const fetchHome = async () => {
       try {
-        const res = await fetch('/api/last-game');
+        const res = await fetch('/api/home');
         if (res.ok) {
           const data = await res.json();
-          setLastGame(data);
+          setLastGame(data.last_game);
+          setNextGame(data.next_game);
+          setUpcomingGames(data.upcoming);
         }
       } catch (error) {
-        console.error("Error fetching last game:", error);
-      }
-    };
-
-    const fetchSchedule = async () => {
-      try {
-        const res = await fetch('/api/schedule');
-        if (res.ok) {
-          const games = await res.json();
-          if (games.length > 0) {
-            setNextGame(games[0]);
-            setUpcomingGames(games.slice(1));
-          }
-        }
-      } catch (error) {
-        console.error("Error fetching schedule:", error);
+        console.error("Error fetching home data:", error);
       }
     };
 
     const loadAll = async () => {
       setLoading(true);
-      await Promise.all([fetchLastGame(), fetchSchedule()]);
+      await fetchHome();
       setLoading(false);
     };
 
     loadAll();
+
+    // Refetch in the background when the server pushes a data change
+    return subscribeToUpdates(fetchHome);
   }, []);
 
   if (loading) {
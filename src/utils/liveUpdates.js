@@ -0,0 +1,39 @@
+// Where to open the stream. Production builds only stream when VITE_STREAM_URL
+// names a long-lived server (stream_server.py): on Vercel, /api/stream would hit
+// the serverless Flask function. The dev server proxies /api to Flask.
+const streamUrl = () => {
+  if (import.meta.env.VITE_STREAM_URL) {
+    return import.meta.env.VITE_STREAM_URL;
+  }
+  return import.meta.env.DEV ? '/api/stream' : null;
+};
+
+// Subscribe to the update stream and call onChange whenever the served data
+// changes. Returns a cleanup function for useEffect.
+export const subscribeToUpdates = (onChange) => {
+  const url = streamUrl();
+  if (!url || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  const source = new EventSource(url);
+  let version = null;
+
+  // A reset is sent on connect and when a resume isn't possible; it only
+  // means new data if the version moved since we last saw it
+  source.addEventListener('reset', (event) => {
+    const data = JSON.parse(event.data);
+    if (version !== null && data.version !== version) {
+      onChange(data);
+    }
+    version = data.version;
+  });
+
+  source.addEventListener('version', (event) => {
+    const data = JSON.parse(event.data);
+    version = data.version;
+    onChange(data);
+  });
+
+  return () => source.close();
+};